@@ -9,18 +9,31 @@ See ADR-006 for design details.
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
 import re
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import aiohttp
 import yaml
 
+# libyaml-backed loader is much faster; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is used otherwise
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,10 +44,28 @@ logger = logging.getLogger(__name__)
 
 # Constants
 GITHUB_API_BASE = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_BASE}/graphql"
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
 CONFIG_FILE = "templates.yaml"
 DEFAULT_CACHE_DIR = Path(".cache/templates")
 DEFAULT_OUTPUT_DIR = Path("docs/templates")
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_RAW_CONCURRENCY = 32
+MAX_RETRIES = 3
+READ_CHUNK_SIZE = 64 * 1024
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+
+# Markdown image or link: optional "!", [text], (path). Text excludes "[" so an
+# image nested in a link (e.g. a badge) matches as the image itself.
+MARKDOWN_REF_PATTERN = re.compile(r"(!?)\[([^\[\]]*)\]\(([^)]+)\)")
+
+# Returned by GitHubFetcher.fetch_file when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string (e.g. 2026-01-03T10:00:00Z)."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 @dataclass
@@ -49,11 +80,31 @@ class CacheManifest:
             return False
         return self.entries[template_id].get("commit_sha") == commit_sha
 
-    def update(self, template_id: str, commit_sha: str, files: list[str]) -> None:
-        """Update cache entry for a template."""
+    def get_file(self, template_id: str, name: str) -> dict[str, Any]:
+        """Get the cached record for one output file (empty if unknown)."""
+        for entry in self.entries.get(template_id, {}).get("files", []):
+            # Older manifests stored bare file names without ETags
+            if isinstance(entry, dict) and entry.get("name") == name:
+                return entry
+        return {}
+
+    def update(
+        self,
+        template_id: str,
+        commit_sha: str,
+        files: list[dict[str, Any]],
+        fetched_at: str | None = None,
+    ) -> None:
+        """Update cache entry for a template.
+
+        Each item in files is a record like {"name", "etag", "sha256",
+        "commit_sha"}, where commit_sha is the commit the output was last
+        rendered from (it lags the entry's commit_sha for unchanged docs).
+        fetched_at is an ISO-8601 UTC timestamp (defaults to now).
+        """
         self.entries[template_id] = {
             "commit_sha": commit_sha,
-            "fetched_at": datetime.utcnow().isoformat() + "Z",
+            "fetched_at": fetched_at or utc_timestamp(),
             "files": files,
         }
 
@@ -62,24 +113,83 @@ class CacheManifest:
         """Load manifest from disk."""
         if path.exists():
             try:
-                data = json.loads(path.read_text())
+                raw = path.read_bytes()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
                 return cls(entries=data)
             except (json.JSONDecodeError, TypeError) as e:
                 logger.warning(f"Failed to load cache manifest: {e}")
         return cls()
 
     def save(self, path: Path) -> None:
-        """Save manifest to disk."""
+        """Save manifest to disk atomically (write temp file, then replace)."""
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(self.entries, indent=2))
+        tmp_path = path.with_suffix(".tmp")
+        if orjson:
+            tmp_path.write_bytes(orjson.dumps(self.entries, option=orjson.OPT_INDENT_2))
+        else:
+            tmp_path.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, path)
+
+    def snapshot(self) -> "CacheManifest":
+        """Shallow copy, safe to save from a worker thread while updates continue."""
+        return CacheManifest(entries=dict(self.entries))
+
+
+class AsyncTokenBucket:
+    """Paces requests to a steady rate, allowing bursts up to capacity."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all acquirers for at least the given number of seconds."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            now = time.monotonic()
+            if self._resume_at > now:
+                await asyncio.sleep(self._resume_at - now)
+                now = time.monotonic()
+
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            if self._tokens < 1:
+                # Sleep exactly long enough to accrue the missing token
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 0.0
+                self._updated = time.monotonic()
+            else:
+                self._tokens -= 1
 
 
 class GitHubFetcher:
     """Handles GitHub API interactions."""
 
-    def __init__(self, token: str | None, concurrency: int = 5):
+    def __init__(
+        self,
+        token: str | None,
+        concurrency: int = 5,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        raw_concurrency: int = DEFAULT_RAW_CONCURRENCY,
+    ):
         self.token = token
-        self.semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.raw_concurrency = raw_concurrency
+        # api.github.com is rate limited; raw.githubusercontent.com is not, so
+        # raw content fetches get a separate, wider limit
+        self.api_sem = asyncio.Semaphore(concurrency)
+        self.raw_sem = asyncio.Semaphore(raw_concurrency)
+        self._bucket = AsyncTokenBucket(requests_per_second, concurrency)
         self._session: aiohttp.ClientSession | None = None
 
     @property
@@ -93,19 +203,87 @@ class GitHubFetcher:
         return headers
 
     async def __aenter__(self) -> "GitHubFetcher":
-        self._session = aiohttp.ClientSession(headers=self.headers)
+        # One pooled connector for api.github.com and raw.githubusercontent.com
+        # so TLS connections and DNS lookups are reused across requests
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency + self.raw_concurrency,
+            limit_per_host=max(self.concurrency, self.raw_concurrency),
+            ttl_dns_cache=600,
+            keepalive_timeout=60,
+        )
+        self._session = aiohttp.ClientSession(
+            headers=self.headers, connector=connector, timeout=REQUEST_TIMEOUT
+        )
         return self
 
     async def __aexit__(self, *args: Any) -> None:
         if self._session:
             await self._session.close()
 
+    async def _request(
+        self, method: str, url: str, paced: bool = True, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """Send a request, retrying on rate limits and server errors.
+
+        Paced (API) requests wait for the token bucket first. Honors
+        Retry-After and X-RateLimit-Remaining/Reset; other retryable failures
+        back off exponentially. The caller must release the response (use it
+        as an async context manager).
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            if paced:
+                await self._bucket.acquire()
+            resp = await self._session.request(method, url, **kwargs)
+
+            # Primary rate limit exhausted: hold everyone until the window resets
+            if resp.headers.get("X-RateLimit-Remaining") == "0":
+                reset = resp.headers.get("X-RateLimit-Reset", "")
+                if reset.isdigit():
+                    self._bucket.pause(max(0, int(reset) - time.time()))
+
+            rate_limited = resp.status == 429 or (
+                resp.status == 403
+                and ("Retry-After" in resp.headers
+                     or resp.headers.get("X-RateLimit-Remaining") == "0")
+            )
+            if attempt == MAX_RETRIES or not (rate_limited or resp.status >= 500):
+                return resp
+
+            resp.release()
+            retry_after = resp.headers.get("Retry-After")
+            delay = int(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            logger.warning(
+                f"GitHub returned {resp.status} for {url}, retrying in {delay}s"
+            )
+            # Only rate limits hold back every API request; a server error
+            # backs off this request alone
+            if paced and rate_limited:
+                self._bucket.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+        return resp
+
+    @staticmethod
+    async def _read_body(resp: aiohttp.ClientResponse) -> bytearray:
+        """Read a response body in chunks into one (pre-sized when possible) buffer."""
+        # Content-Length is the on-the-wire size; a compressed body decodes
+        # larger, so the buffer still grows past it when needed
+        buf = bytearray(int(resp.headers.get("Content-Length") or 0))
+        offset = 0
+        async for chunk in resp.content.iter_chunked(READ_CHUNK_SIZE):
+            end = offset + len(chunk)
+            buf[offset:end] = chunk
+            offset = end
+        del buf[offset:]
+        return buf
+
     async def get_commit_sha(self, owner: str, repo: str) -> str | None:
         """Get the SHA of the default branch HEAD."""
-        async with self.semaphore:
+        async with self.api_sem:
             url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/commits/HEAD"
             try:
-                async with self._session.get(url) as resp:
+                async with await self._request("GET", url) as resp:
                     if resp.status == 200:
                         data = await resp.json()
                         return data["sha"]
@@ -113,124 +291,251 @@ class GitHubFetcher:
                         f"Failed to get HEAD SHA for {owner}/{repo}: {resp.status}"
                     )
                     return None
-            except aiohttp.ClientError as e:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.error(f"Network error getting SHA for {owner}/{repo}: {e}")
                 return None
 
+    async def get_commit_shas_bulk(
+        self, repos: list[tuple[str, str]]
+    ) -> dict[str, str]:
+        """Get default branch HEAD SHAs for many repos in one GraphQL query.
+
+        Returns a dict keyed by "owner/name". Repos the GraphQL query could not
+        resolve (or all of them, if GraphQL is unavailable) fall back to REST.
+        """
+        repos = list(dict.fromkeys(repos))
+        if not repos:
+            return {}
+
+        shas: dict[str, str] = {}
+
+        # GraphQL requires authentication; unauthenticated runs go straight to REST
+        if self.token:
+            # Alias one repository() lookup per repo; values travel as variables
+            # so owner/name never get interpolated into the query text
+            var_defs = []
+            fields = []
+            variables: dict[str, str] = {}
+            for i, (owner, repo) in enumerate(repos):
+                var_defs.append(f"$o{i}: String!, $n{i}: String!")
+                fields.append(
+                    f"r{i}: repository(owner: $o{i}, name: $n{i}) "
+                    "{ defaultBranchRef { target { oid } } }"
+                )
+                variables[f"o{i}"] = owner
+                variables[f"n{i}"] = repo
+            query = f"query({', '.join(var_defs)}) {{ {' '.join(fields)} }}"
+
+            async with self.api_sem:
+                try:
+                    async with await self._request(
+                        "POST",
+                        GITHUB_GRAPHQL_URL,
+                        json={"query": query, "variables": variables},
+                    ) as resp:
+                        if resp.status == 200:
+                            payload = await resp.json()
+                            data = payload.get("data") or {}
+                            for i, (owner, repo) in enumerate(repos):
+                                node = data.get(f"r{i}") or {}
+                                target = (node.get("defaultBranchRef") or {}).get("target") or {}
+                                if target.get("oid"):
+                                    shas[f"{owner}/{repo}"] = target["oid"]
+                        else:
+                            logger.warning(f"GraphQL SHA lookup failed: {resp.status}")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Network error in GraphQL SHA lookup: {e}")
+
+        # REST fallback for anything GraphQL did not resolve
+        missing = [(o, r) for o, r in repos if f"{o}/{r}" not in shas]
+        if missing:
+            if self.token:
+                logger.info(f"Falling back to REST for {len(missing)} repo(s)")
+            results = await asyncio.gather(
+                *[self.get_commit_sha(owner, repo) for owner, repo in missing]
+            )
+            for (owner, repo), sha in zip(missing, results):
+                if sha:
+                    shas[f"{owner}/{repo}"] = sha
+
+        return shas
+
     async def fetch_file(
-        self, owner: str, repo: str, sha: str, path: str
-    ) -> str | None:
-        """Fetch raw file content (no API rate limit)."""
-        async with self.semaphore:
+        self, owner: str, repo: str, sha: str, path: str, etag: str | None = None
+    ) -> tuple[str | object | None, str | None]:
+        """Fetch raw file content (no API rate limit).
+
+        If etag is given, the request is conditional (If-None-Match) and an
+        unchanged file yields NOT_MODIFIED instead of a body.
+
+        Returns:
+            Tuple of (content, etag); content is None on failure.
+        """
+        async with self.raw_sem:
             url = f"{GITHUB_RAW_BASE}/{owner}/{repo}/{sha}/{path}"
+            headers = {"If-None-Match": etag} if etag else None
             try:
-                async with self._session.get(url) as resp:
+                async with await self._request("GET", url, paced=False, headers=headers) as resp:
+                    if resp.status == 304:
+                        return NOT_MODIFIED, etag
                     if resp.status == 200:
-                        return await resp.text()
+                        body = await self._read_body(resp)
+                        return body.decode(resp.charset or "utf-8"), resp.headers.get("ETag")
                     logger.warning(f"File not found: {path} in {owner}/{repo}")
-                    return None
-            except aiohttp.ClientError as e:
+                    return None, None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.error(f"Network error fetching {path}: {e}")
-                return None
+                return None, None
 
 
 class ContentTransformer:
     """Transforms aggregated content for the unified site."""
 
-    def __init__(self, owner: str, repo: str, commit_sha: str, source_path: str):
+    def __init__(
+        self,
+        owner: str,
+        repo: str,
+        commit_sha: str,
+        source_path: str = "",
+        synced_on: str | None = None,
+    ):
         self.owner = owner
         self.repo = repo
         self.commit_sha = commit_sha
+        # Sync date (YYYY-MM-DD) shown in the attribution; defaults to today
+        self.synced_on = synced_on or utc_timestamp()[:10]
+        # URL prefixes are fixed per template; only the doc's base path varies
+        self._raw_prefix = f"{GITHUB_RAW_BASE}/{owner}/{repo}/{commit_sha}/"
+        self._blob_prefix = f"https://github.com/{owner}/{repo}/blob/{commit_sha}/"
+        # Same relative paths tend to repeat within and across docs
+        self._resolve_cache: dict[tuple[str, str], str] = {}
+        self.set_source(source_path)
+
+    def set_source(self, source_path: str) -> None:
+        """Point the transformer at the next doc of the same template."""
         self.base_path = Path(source_path).parent
+        self._base_str = self.base_path.as_posix()
 
     def transform(self, content: str) -> str:
         """Apply all transformations to content."""
-        content = self._rewrite_images(content)
-        content = self._rewrite_links(content)
+        # Cheap substring check: content without "](" has no links or images
+        if "](" in content:
+            content = self._rewrite_refs(content)
         content = self._add_attribution(content)
         return content
 
-    def _rewrite_images(self, content: str) -> str:
-        """Rewrite relative image paths to raw.githubusercontent.com URLs."""
-        pattern = r"!\[([^\]]*)\]\(([^)]+)\)"
+    def _rewrite_refs(self, content: str) -> str:
+        """Rewrite relative images and markdown links in a single pass.
 
-        def replace_image(match: re.Match) -> str:
-            alt_text = match.group(1)
-            path = match.group(2)
+        Images point at raw.githubusercontent.com; links to .md files point
+        at GitHub blob URLs.
+        """
+        return MARKDOWN_REF_PATTERN.sub(self._replace_ref, content)
 
+    def _replace_ref(self, match: re.Match) -> str:
+        bang, text, path = match.groups()
+
+        if bang:
             # Skip already-absolute URLs
             if path.startswith(("http://", "https://", "//")):
                 return match.group(0)
 
             # Resolve relative path
             resolved = self._resolve_path(path)
-            absolute_url = f"{GITHUB_RAW_BASE}/{self.owner}/{self.repo}/{self.commit_sha}/{resolved}"
-            return f"![{alt_text}]({absolute_url})"
-
-        return re.sub(pattern, replace_image, content)
-
-    def _rewrite_links(self, content: str) -> str:
-        """Rewrite relative markdown links to GitHub blob URLs."""
-        pattern = r"\[([^\]]+)\]\(([^)]+)\)"
-
-        def replace_link(match: re.Match) -> str:
-            text = match.group(1)
-            path = match.group(2)
-
-            # Skip already-absolute URLs and anchors
-            if path.startswith(("http://", "https://", "//", "#", "mailto:")):
-                return match.group(0)
-
-            # Check if it's a markdown file
-            if path.endswith(".md"):
-                resolved = self._resolve_path(path)
-                absolute_url = f"https://github.com/{self.owner}/{self.repo}/blob/{self.commit_sha}/{resolved}"
-                return f"[{text}]({absolute_url})"
+            return f"![{text}]({self._raw_prefix}{resolved})"
 
+        # Skip empty link text, already-absolute URLs and anchors
+        if not text or path.startswith(("http://", "https://", "//", "#", "mailto:")):
             return match.group(0)
 
-        return re.sub(pattern, replace_link, content)
-
-    def _resolve_path(self, relative_path: str) -> str:
-        """Resolve a relative path against the base directory."""
-        # Remove leading ./
-        if relative_path.startswith("./"):
-            relative_path = relative_path[2:]
-
-        # Resolve against base path
-        resolved = (self.base_path / relative_path).as_posix()
+        # Check if it's a markdown file
+        if path.endswith(".md"):
+            resolved = self._resolve_path(path)
+            return f"[{text}]({self._blob_prefix}{resolved})"
 
-        # Normalize (remove ../ etc)
-        parts = []
-        for part in resolved.split("/"):
-            if part == "..":
-                if parts:
-                    parts.pop()
-            elif part and part != ".":
-                parts.append(part)
+        return match.group(0)
 
-        return "/".join(parts)
+    def _resolve_path(self, relative_path: str) -> str:
+        """Resolve a relative path against the base directory (memoized)."""
+        key = (self._base_str, relative_path)
+        resolved = self._resolve_cache.get(key)
+        if resolved is None:
+            resolved = self._resolve_cache[key] = _resolve(*key)
+        return resolved
 
     def _add_attribution(self, content: str) -> str:
         """Add source attribution to content."""
         source_url = f"https://github.com/{self.owner}/{self.repo}"
-        now = datetime.utcnow().strftime("%Y-%m-%d")
 
         attribution = f"""!!! info "Source Repository"
     This documentation is from [{self.owner}/{self.repo}]({source_url}).
-    Last synced: {now} | Commit: `{self.commit_sha[:7]}`
+    Last synced: {self.synced_on} | Commit: `{self.commit_sha[:7]}`
 
 """
         return attribution + content
 
 
+def _resolve(base: str, relative_path: str) -> str:
+    """Resolve a relative POSIX path against base using string operations only."""
+    # Remove leading ./
+    if relative_path.startswith("./"):
+        relative_path = relative_path[2:]
+
+    # Resolve against base path (an absolute path replaces the base, like Path /)
+    if relative_path.startswith("/"):
+        resolved = relative_path
+    else:
+        resolved = f"{base}/{relative_path}" if base else relative_path
+
+    # Normalize (remove ../ etc)
+    parts = []
+    for part in resolved.split("/"):
+        if part == "..":
+            if parts:
+                parts.pop()
+        elif part and part != ".":
+            parts.append(part)
+
+    return "/".join(parts)
+
+
+def _write_files(files: list[tuple[Path, str]]) -> None:
+    """Write (path, content) pairs to disk."""
+    for path, content in files:
+        path.write_text(content, encoding="utf-8")
+
+
+def _malformed_reason(template: Any) -> str | None:
+    """Why a configured template cannot be aggregated, or None if it can."""
+    if not isinstance(template, dict):
+        return "entry is not a mapping"
+    if not isinstance(template.get("id"), str) or not template["id"]:
+        return "missing 'id'"
+    repo = template.get("repo")
+    if not isinstance(repo, dict):
+        return "missing 'repo'"
+    for key in ("owner", "name"):
+        if not isinstance(repo.get(key), str) or not repo[key]:
+            return f"missing 'repo.{key}'"
+    return None
+
+
 async def aggregate_template(
     template: dict[str, Any],
     fetcher: GitHubFetcher,
     cache: CacheManifest,
     output_dir: Path,
-) -> tuple[str, str]:
-    """Aggregate a single template's documentation."""
+    commit_sha: str | None,
+    run_timestamp: str | None = None,
+) -> tuple[str, str, bool]:
+    """Aggregate a single template's documentation.
+
+    Returns (template_id, commit_sha, changed); commit_sha is empty on
+    failure and changed is True only when the cache entry was updated.
+    commit_sha is the pre-resolved HEAD SHA (see get_commit_shas_bulk).
+    run_timestamp is the run's ISO-8601 UTC start time, shared by all templates.
+    Expects output_dir / template id to exist already.
+    """
     template_id = template["id"]
     owner = template["repo"]["owner"]
     repo_name = template["repo"]["name"]
@@ -238,51 +543,104 @@ async def aggregate_template(
 
     logger.info(f"Processing template: {template_id} ({repo_full})")
 
-    # Get current commit SHA
-    commit_sha = await fetcher.get_commit_sha(owner, repo_name)
     if not commit_sha:
         logger.warning(f"Could not get commit SHA for {repo_full}, skipping")
-        return template_id, ""
+        return template_id, "", False
 
     # Check cache
     if cache.is_cached(template_id, commit_sha):
         logger.info(f"  Using cached content (SHA: {commit_sha[:7]})")
-        return template_id, commit_sha
+        return template_id, commit_sha, False
 
     logger.info(f"  Fetching fresh content (SHA: {commit_sha[:7]})")
 
-    # Prepare output directory
+    # Output directory is created up front by main()
     template_output = output_dir / template_id
-    template_output.mkdir(parents=True, exist_ok=True)
 
     # Fetch and process each doc
     fetched_files = []
+    pending_writes: list[tuple[Path, str]] = []
     docs = template.get("directories", {}).get("docs", [])
 
-    for doc in docs:
+    # Only reuse cached state when we still have the previous output on disk
+    cached_files = [
+        cache.get_file(template_id, doc["target"])
+        if (template_output / doc["target"]).exists()
+        else {}
+        for doc in docs
+    ]
+
+    # Fetch all docs concurrently; the fetcher's raw_sem caps the total
+    fetches = await asyncio.gather(
+        *[
+            fetcher.fetch_file(
+                owner, repo_name, commit_sha, doc["path"], etag=cached_file.get("etag")
+            )
+            for doc, cached_file in zip(docs, cached_files)
+        ],
+        return_exceptions=True,
+    )
+
+    # One transformer per template; it is re-pointed at each doc's path
+    run_timestamp = run_timestamp or utc_timestamp()
+    transformer = ContentTransformer(
+        owner, repo_name, commit_sha, synced_on=run_timestamp[:10]
+    )
+
+    for doc, cached_file, fetched in zip(docs, cached_files, fetches):
         source_path = doc["path"]
         target_name = doc["target"]
 
-        # Fetch content
-        content = await fetcher.fetch_file(owner, repo_name, commit_sha, source_path)
+        output_file = template_output / target_name
+
+        if isinstance(fetched, Exception):
+            logger.warning(f"  Could not fetch {source_path}: {fetched}")
+            continue
+        content, etag = fetched
+        if content is NOT_MODIFIED:
+            fetched_files.append(cached_file)
+            logger.info(f"  Unchanged {target_name}")
+            continue
         if not content:
             logger.warning(f"  Could not fetch {source_path}")
             continue
 
-        # Transform content
-        transformer = ContentTransformer(owner, repo_name, commit_sha, source_path)
-        content = transformer.transform(content)
+        # Skip transform and write when the source is byte-identical to last run.
+        # Hash the fetched source, not the output: the attribution header and
+        # rewritten URLs embed the commit SHA and sync date, so the output
+        # changes whenever HEAD moves even if this doc did not. The kept
+        # output still names the commit it was rendered from, which the
+        # carried-forward record's commit_sha reflects.
+        sha256 = hashlib.sha256(content.encode()).hexdigest()
+        if sha256 == cached_file.get("sha256"):
+            fetched_files.append({**cached_file, "etag": etag})
+            logger.info(f"  Unchanged {target_name}")
+            continue
 
-        # Write output
-        output_file = template_output / target_name
-        output_file.write_text(content)
-        fetched_files.append(target_name)
-        logger.info(f"  Wrote {target_name}")
+        # Transform content; non-markdown targets are passed through as-is since
+        # link rewriting and the admonition header only make sense in markdown
+        if target_name.endswith(".md"):
+            transformer.set_source(source_path)
+            content = transformer.transform(content)
+
+        pending_writes.append((output_file, content))
+        fetched_files.append({
+            "name": target_name,
+            "etag": etag,
+            "sha256": sha256,
+            "commit_sha": commit_sha,
+        })
+
+    # Write outputs in one worker-thread hop so disk I/O doesn't block the loop
+    if pending_writes:
+        await asyncio.to_thread(_write_files, pending_writes)
+        for output_file, _ in pending_writes:
+            logger.info(f"  Wrote {output_file.name}")
 
     # Update cache
-    cache.update(template_id, commit_sha, fetched_files)
+    cache.update(template_id, commit_sha, fetched_files, fetched_at=run_timestamp)
 
-    return template_id, commit_sha
+    return template_id, commit_sha, True
 
 
 def load_config(config_path: str = CONFIG_FILE) -> dict[str, Any]:
@@ -292,8 +650,8 @@ def load_config(config_path: str = CONFIG_FILE) -> dict[str, Any]:
         logger.error(f"Configuration file not found: {config_path}")
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
-    with open(path) as f:
-        return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=SafeLoader)
 
 
 async def main() -> None:
@@ -304,11 +662,20 @@ async def main() -> None:
     except FileNotFoundError:
         return
 
+    # One timestamp for the whole run (manifest entries and attribution dates)
+    run_timestamp = utc_timestamp()
+
     # Get settings
     settings = config.get("settings", {})
     cache_dir = Path(settings.get("cache", {}).get("directory", DEFAULT_CACHE_DIR))
     output_dir = Path(settings.get("output", {}).get("docs_directory", DEFAULT_OUTPUT_DIR))
     concurrency = settings.get("github_api", {}).get("concurrency", 5)
+    requests_per_second = settings.get("github_api", {}).get(
+        "requests_per_second", DEFAULT_REQUESTS_PER_SECOND
+    )
+    raw_concurrency = settings.get("github_api", {}).get(
+        "raw_concurrency", DEFAULT_RAW_CONCURRENCY
+    )
 
     # Get GitHub token
     token = os.environ.get("GITHUB_TOKEN")
@@ -317,33 +684,66 @@ async def main() -> None:
 
     # Load cache manifest
     manifest_path = cache_dir / "manifest.json"
-    cache = CacheManifest.load(manifest_path)
-
-    # Ensure output directory exists
-    output_dir.mkdir(parents=True, exist_ok=True)
+    cache = await asyncio.to_thread(CacheManifest.load, manifest_path)
 
     # Aggregate all templates
     templates = config.get("templates", [])
     logger.info(f"Aggregating {len(templates)} templates...")
 
-    async with GitHubFetcher(token, concurrency) as fetcher:
-        results = await asyncio.gather(
-            *[
-                aggregate_template(template, fetcher, cache, output_dir)
-                for template in templates
-            ],
-            return_exceptions=True,
+    # Drop malformed entries up front so one bad entry cannot abort the run
+    well_formed = []
+    for index, template in enumerate(templates):
+        reason = _malformed_reason(template)
+        if reason:
+            logger.error(f"Skipping templates[{index}]: {reason}")
+        else:
+            well_formed.append(template)
+
+    # Ensure output directories exist (one pass; parents come first when sorted)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for template_output in sorted({output_dir / t["id"] for t in well_formed}):
+        template_output.mkdir(exist_ok=True)
+
+    async with GitHubFetcher(
+        token, concurrency, requests_per_second, raw_concurrency
+    ) as fetcher:
+        # Resolve every HEAD SHA up front in a single GraphQL round-trip
+        shas = await fetcher.get_commit_shas_bulk(
+            [(t["repo"]["owner"], t["repo"]["name"]) for t in well_formed]
         )
 
+        # Bound in-flight templates so finished ones release their buffers
+        # before the next start; results are consumed as they complete
+        template_slots = asyncio.Semaphore(concurrency)
+
+        async def bounded(template: dict[str, Any]) -> tuple[str, str, bool]:
+            async with template_slots:
+                return await aggregate_template(
+                    template,
+                    fetcher,
+                    cache,
+                    output_dir,
+                    shas.get(f"{template['repo']['owner']}/{template['repo']['name']}"),
+                    run_timestamp,
+                )
+
         success_count = 0
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"Aggregation error: {result}")
-            elif result[1]:  # Has commit SHA = success
+        for next_result in asyncio.as_completed([bounded(t) for t in well_formed]):
+            try:
+                result = await next_result
+            except Exception as e:
+                logger.error(f"Aggregation error: {e}")
+                continue
+            _, commit_sha, changed = result
+            if commit_sha:  # Has commit SHA = success
                 success_count += 1
+            if changed:
+                # Persist progress so a crash later in the run only loses
+                # the templates still in flight; cache hits change nothing
+                await asyncio.to_thread(cache.snapshot().save, manifest_path)
 
     # Save cache manifest
-    cache.save(manifest_path)
+    await asyncio.to_thread(cache.save, manifest_path)
 
     logger.info(f"Aggregation complete: {success_count}/{len(templates)} templates processed")
 
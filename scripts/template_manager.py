@@ -7,30 +7,59 @@ See ADR-007 for design documentation.
 Usage:
     python scripts/template_manager.py validate [--deep] [--templates PATH] [--schema PATH]
     python scripts/template_manager.py list [--format text|json] [--category CAT] [--tier TIER]
+    python scripts/template_manager.py compile-schema [--schema PATH]
 """
 
 from __future__ import annotations
 
 import argparse
+import errno
+import functools
+import io
 import json
+import os
 import re
+import secrets
+import stat
 import sys
+import tempfile
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
-from ruamel.yaml import YAML
-import jsonschema
+if TYPE_CHECKING:
+    import jsonschema
+    from ruamel.yaml import YAML
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json is used otherwise
+    orjson = None
 
-class SafeJSONEncoder(json.JSONEncoder):
-    """JSON encoder that handles datetime and other special types from ruamel.yaml."""
 
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        return super().default(obj)
+def _plain_key(key: Any) -> str:
+    """Coerce a mapping key to a string the way json.dumps does."""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    return str(key)
+
+
+def _to_plain(obj: Any) -> Any:
+    """Convert loaded YAML into JSON-compatible plain types for jsonschema.
+
+    Mappings become dicts with string keys, sequences become lists, and
+    dates/datetimes become ISO strings (as JSON would encode them).
+    """
+    if isinstance(obj, dict):
+        return {_plain_key(k): _to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_plain(item) for item in obj]
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return obj
 
 
 # Default paths relative to project root (script is in scripts/)
@@ -39,8 +68,19 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 DEFAULT_TEMPLATES_PATH = PROJECT_ROOT / "templates.yaml"
 DEFAULT_SCHEMA_PATH = PROJECT_ROOT / "templates.schema.yaml"
 
+# Stable WriteResult error codes (see WriteResult.has_error); messages may change
+ERR_INVALID_ID = "invalid_id_format"
+ERR_INVALID_OWNER = "invalid_repo_owner"
+ERR_INVALID_REPO = "invalid_repo_name"
+ERR_DUPLICATE_ID = "duplicate_id"
+ERR_INVALID_CATEGORY = "invalid_category"
+ERR_NOT_FOUND = "not_found"
+ERR_EMPTY_FILE = "empty_file"
+ERR_LOAD_FAILED = "load_failed"
+ERR_SAVE_FAILED = "save_failed"
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ValidationResult:
     """Result of validation operations."""
 
@@ -50,23 +90,81 @@ class ValidationResult:
     warnings: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WriteResult:
-    """Result of write operations (add, update, remove)."""
+    """Result of write operations (add, update, remove).
+
+    On success, data holds the saved registry so callers can validate it
+    with validate_data() without re-reading the file. On failure,
+    error_codes holds one ERR_* code per kind of error in errors.
+    """
 
     success: bool
     errors: list[str] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
+    data: dict[str, Any] | None = None
+    error_codes: frozenset[str] = frozenset()
+
+    def has_error(self, code: str) -> bool:
+        """Return True if the operation failed with the given ERR_* code."""
+        return code in self.error_codes
+
+
+def _write_error(code: str, message: str) -> WriteResult:
+    """Build a failed WriteResult carrying a single coded error."""
+    return WriteResult(success=False, errors=[message], error_codes=frozenset((code,)))
+
+
+@dataclass
+class RegistryIndex:
+    """Lookup tables built in one pass over a parsed templates.yaml."""
 
+    by_id: dict[str, int] = field(default_factory=dict)
+    referenced_by: dict[str, list[str]] = field(default_factory=dict)
+    category_ids: set[str] = field(default_factory=set)
+
+
+# Identifier patterns are unanchored; always match them with fullmatch()
+# (unlike "$", fullmatch also rejects a trailing newline).
 
 # Template ID pattern: lowercase letters, numbers, hyphens, must start with letter
-TEMPLATE_ID_PATTERN = re.compile(r"^[a-z][a-z0-9-]*$")
+TEMPLATE_ID_PATTERN = re.compile(r"[a-z][a-z0-9-]*")
 
 # GitHub owner/repo patterns (security: prevent injection via malformed names)
 # Owner: alphanumeric and hyphens, 1-39 chars, cannot start/end with hyphen
-GITHUB_OWNER_PATTERN = re.compile(r"^[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,37}[a-zA-Z0-9])?$")
+GITHUB_OWNER_PATTERN = re.compile(r"[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,37}[a-zA-Z0-9])?")
 # Repo: alphanumeric, hyphens, underscores, dots, 1-100 chars
-GITHUB_REPO_PATTERN = re.compile(r"^[a-zA-Z0-9._-]{1,100}$")
+GITHUB_REPO_PATTERN = re.compile(r"[a-zA-Z0-9._-]{1,100}")
+
+# Template maturity tiers (matches the tier enum in templates.schema.yaml)
+TIERS = ("starter", "production", "stable", "beta", "experimental")
+
+TEMPLATE_ID_ERROR = (
+    "must be lowercase letters, numbers, and hyphens, starting with a letter"
+)
+
+
+def _validate_identifiers(template_id: str, repo_owner: str, repo_name: str) -> dict[str, str]:
+    """Check template ID and GitHub owner/repo names against their patterns.
+
+    Returns:
+        Error messages keyed by ERR_* code (empty if all identifiers are valid)
+    """
+    errors = {}
+    if not TEMPLATE_ID_PATTERN.fullmatch(template_id):
+        errors[ERR_INVALID_ID] = f"Invalid template ID '{template_id}': {TEMPLATE_ID_ERROR}"
+    # Security: prevent injection via malformed owner/repo names
+    if not GITHUB_OWNER_PATTERN.fullmatch(repo_owner):
+        errors[ERR_INVALID_OWNER] = (
+            f"Invalid repo owner '{repo_owner}': must be 1-39 alphanumeric characters or hyphens, "
+            "cannot start or end with hyphen"
+        )
+    if not GITHUB_REPO_PATTERN.fullmatch(repo_name):
+        errors[ERR_INVALID_REPO] = (
+            f"Invalid repo name '{repo_name}': must be 1-100 alphanumeric characters, hyphens, "
+            "underscores, or dots"
+        )
+    return errors
 
 
 def get_yaml_handler(safe_mode: bool = False) -> YAML:
@@ -76,6 +174,8 @@ def get_yaml_handler(safe_mode: bool = False) -> YAML:
         safe_mode: If True, use safe loader and add DoS protections.
                    Use for untrusted input (validation path).
     """
+    from ruamel.yaml import YAML
+
     if safe_mode:
         yaml = YAML(typ='safe')
     else:
@@ -87,6 +187,22 @@ def get_yaml_handler(safe_mode: bool = False) -> YAML:
     return yaml
 
 
+@functools.cache
+def get_yaml_handler_fast() -> YAML:
+    """Return the shared YAML handler for read-only loads.
+
+    Uses the safe loader, which picks the libyaml-based C parser from
+    ruamel.yaml.clib when installed. No comment preservation, so only use
+    it for paths that never write back (validation, listing).
+    """
+    from ruamel.yaml import YAML
+
+    yaml = YAML(typ="safe")
+    # Security: Prevent duplicate-key shadowing attacks
+    yaml.allow_duplicate_keys = False
+    return yaml
+
+
 def load_yaml(path: Path, safe_mode: bool = True) -> dict[str, Any]:
     """Load a YAML file and return its contents.
 
@@ -95,15 +211,43 @@ def load_yaml(path: Path, safe_mode: bool = True) -> dict[str, Any]:
     Raises ValueError if path is a symlink (security: prevent LFI attacks).
 
     Uses O_NOFOLLOW to prevent TOCTOU race conditions with symlinks.
+    Safe-mode results are memoized per file version (inode, mtime, size),
+    so callers must treat the returned data as read-only.
 
     Args:
         path: Path to YAML file
         safe_mode: If True, use safe loader (default for validation).
     """
-    import os
-    import errno
+    if not safe_mode:
+        return _read_yaml(path, safe_mode=False)
+
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        # Let the uncached read raise the usual error
+        return _read_yaml(path)
+    if stat.S_ISLNK(st.st_mode):
+        raise ValueError(f"Refusing to read symlink for security: {path}")
+    return _load_yaml_cached(str(path), st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_yaml_cached(path: str, ino: int, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Parse a YAML file version in safe mode (keyed by inode, mtime and size)."""
+    return _read_yaml(Path(path))
+
 
-    yaml = get_yaml_handler(safe_mode=safe_mode)
+def _read_yaml(
+    path: Path,
+    safe_mode: bool = True,
+    load: Callable[[Any], Any] | None = None,
+) -> dict[str, Any]:
+    """Read and parse a YAML file (see load_yaml), without caching.
+
+    load overrides the ruamel loader, e.g. with PyYAML (see _load_yaml_plain).
+    """
+    if load is None:
+        load = (get_yaml_handler_fast() if safe_mode else get_yaml_handler()).load
 
     # Security: Use O_NOFOLLOW to atomically reject symlinks (prevents TOCTOU)
     # This is safer than checking is_symlink() then open() - no race window
@@ -116,14 +260,15 @@ def load_yaml(path: Path, safe_mode: bool = True) -> dict[str, Any]:
 
     # Properly handle fd to avoid leaks if fdopen fails
     try:
-        f = os.fdopen(fd, "r")
+        f = os.fdopen(fd, "r", encoding="utf-8")
     except Exception:
         os.close(fd)  # Close fd if fdopen failed to take ownership
         raise
 
     try:
         with f:
-            data = yaml.load(f)
+            # Parse one contiguous string rather than pulling from the stream
+            data = load(f.read())
             # Handle empty files that return None
             if data is None:
                 return {}
@@ -135,6 +280,20 @@ def load_yaml(path: Path, safe_mode: bool = True) -> dict[str, Any]:
         raise
 
 
+def _load_yaml_plain(path: Path) -> dict[str, Any]:
+    """Load a read-only YAML file with PyYAML's libyaml loader when available.
+
+    PyYAML implements YAML 1.1 (unquoted yes/no/on/off are booleans) and
+    does not reject duplicate keys, so this is only for trusted files that
+    stay YAML-1.1-safe, i.e. templates.schema.yaml. Falls back to load_yaml.
+    """
+    try:
+        from yaml import CSafeLoader, load as pyyaml_load
+    except ImportError:  # PyYAML without libyaml: read with ruamel
+        return load_yaml(path)
+    return _read_yaml(path, load=lambda f: pyyaml_load(f, Loader=CSafeLoader))
+
+
 def load_yaml_raw(path: Path):
     """Load YAML preserving ruamel.yaml structure for comment preservation.
 
@@ -144,9 +303,6 @@ def load_yaml_raw(path: Path):
     Uses O_NOFOLLOW to prevent TOCTOU race conditions with symlinks.
     Uses round-trip mode (not safe) to preserve comments for editing.
     """
-    import os
-    import errno
-
     # Use round-trip mode for comment preservation (needed for write operations)
     yaml = get_yaml_handler(safe_mode=False)
 
@@ -160,63 +316,118 @@ def load_yaml_raw(path: Path):
 
     # Properly handle fd to avoid leaks if fdopen fails
     try:
-        f = os.fdopen(fd, "r")
+        f = os.fdopen(fd, "r", encoding="utf-8")
     except Exception:
         os.close(fd)  # Close fd if fdopen failed to take ownership
         raise
 
     with f:
-        return yaml.load(f)
+        return yaml.load(f.read())
+
+
+def _write_fd(fd: int, payload: bytes, mode: int, durable: bool) -> None:
+    """Write payload to fd in as few syscalls as possible, then set its mode."""
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view):]
+    os.fchmod(fd, mode)
+    if durable:
+        os.fsync(fd)
+
+
+def _fsync_dir(dir_path: Path) -> None:
+    """Flush a directory entry change (e.g. a rename) to disk."""
+    dir_fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _write_unnamed_tempfile(
+    dir_path: Path, name: str, payload: bytes, mode: int, durable: bool = False
+) -> str | None:
+    """Write payload to an O_TMPFILE in dir_path and link it in under a temp name.
 
+    The file only gets a directory entry once fully written and chmod-ed, so
+    an interrupted write never leaves a stray temp file behind.
 
-def save_yaml(path: Path, data) -> None:
+    Returns:
+        Path of the linked temp file, or None where O_TMPFILE or linking via
+        /proc/self/fd is unsupported (caller falls back to mkstemp).
+    """
+    if not hasattr(os, "O_TMPFILE") or not os.path.isdir("/proc/self/fd"):
+        return None
+    try:
+        fd = os.open(dir_path, os.O_TMPFILE | os.O_WRONLY, 0o600)
+    except OSError:
+        return None
+    temp_path = str(dir_path / f".{name}.{secrets.token_hex(8)}.yaml.tmp")
+    try:
+        _write_fd(fd, payload, mode, durable)
+        # Fails with EEXIST instead of following an existing entry
+        os.link(f"/proc/self/fd/{fd}", temp_path)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return temp_path
+
+
+def save_yaml(path: Path, data, durable: bool = False) -> None:
     """Save YAML data preserving comments and formatting.
 
-    Uses secure temporary file to prevent symlink attacks.
+    Uses secure temporary file to prevent symlink attacks (an unnamed
+    O_TMPFILE on Linux, mkstemp elsewhere) and renames it into place.
     Preserves original file permissions if the file exists.
-    Uses O_NOFOLLOW for atomic symlink rejection (no TOCTOU race).
+    Rejects symlinks via lstat; the atomic rename never follows them.
+
+    The rename is atomic but not synced to disk; pass durable=True to fsync
+    the file and its directory so the new contents survive a power loss.
 
     Args:
         path: Path to write to
         data: ruamel.yaml CommentedMap or dict to save
+        durable: If True, fsync the file before and the directory after rename
     """
-    import tempfile
-    import os
-    import stat
-    import errno
-
     yaml = get_yaml_handler()
 
-    # Get original file permissions atomically using O_NOFOLLOW to prevent TOCTOU
-    # O_NOFOLLOW ensures we don't follow symlinks - raises ELOOP if symlink
+    # Get original file permissions with lstat (one syscall, never follows
+    # symlinks). The final rename replaces the directory entry itself, so a
+    # symlink swapped in afterwards is overwritten rather than followed.
     original_mode = None
-    if path.exists():
-        try:
-            # Open without following symlinks and get mode from fd (atomic)
-            check_fd = os.open(str(path), os.O_RDONLY | os.O_NOFOLLOW)
-            try:
-                original_mode = stat.S_IMODE(os.fstat(check_fd).st_mode)
-            finally:
-                os.close(check_fd)
-        except OSError as e:
-            if e.errno == errno.ELOOP:
-                raise ValueError(f"Refusing to write to symlink for security: {path}")
-            # For other errors (permission denied, etc.), use default mode
-            original_mode = None
-
-    # Use secure temp file in same directory for atomic rename
-    dir_path = path.parent
-    fd, temp_path = tempfile.mkstemp(suffix=".yaml.tmp", dir=dir_path)
     try:
-        with os.fdopen(fd, "w") as f:
-            yaml.dump(data, f)
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        # Missing file or other errors (permission denied, etc.): default mode
+        pass
+    else:
+        if stat.S_ISLNK(st.st_mode):
+            raise ValueError(f"Refusing to write to symlink for security: {path}")
+        original_mode = stat.S_IMODE(st.st_mode)
 
-        # Restore original permissions or use sensible default (0644)
-        if original_mode is not None:
-            os.chmod(temp_path, original_mode)
-        else:
-            os.chmod(temp_path, 0o644)
+    # Restore original permissions or use sensible default (0644)
+    mode = original_mode if original_mode is not None else 0o644
+
+    # Serialize to UTF-8 bytes up front so the file is written in one go
+    buf = io.BytesIO()
+    yaml.dump(data, buf)
+    payload = buf.getvalue()
+
+    dir_path = path.parent
+    temp_path = _write_unnamed_tempfile(dir_path, path.name, payload, mode, durable)
+    if temp_path is None:
+        # Use secure temp file in same directory for atomic rename
+        fd, temp_path = tempfile.mkstemp(suffix=".yaml.tmp", dir=dir_path)
+        try:
+            _write_fd(fd, payload, mode, durable)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        finally:
+            os.close(fd)
 
+    try:
         # Atomic move (works on same filesystem)
         Path(temp_path).replace(path)
     except Exception:
@@ -227,6 +438,162 @@ def save_yaml(path: Path, data) -> None:
             pass
         raise
 
+    if durable:
+        _fsync_dir(dir_path)
+
+
+@functools.cache
+def _no_remote_ref_resolver() -> type:
+    """Return the RefResolver subclass used for schema validation.
+
+    Built on first use so that only commands which validate import jsonschema.
+    """
+    import jsonschema
+
+    class NoRemoteRefResolver(jsonschema.RefResolver):
+        """Resolver that refuses to fetch remote references (SSRF prevention)."""
+
+        def resolve_remote(self, uri):
+            raise jsonschema.RefResolutionError(
+                f"Remote $ref resolution disabled for security: {uri}"
+            )
+
+    return NoRemoteRefResolver
+
+
+def _load_schema(schema_path: Path) -> dict[str, Any]:
+    """Load a schema as plain types, preferring its compiled JSON sibling.
+
+    The .json sibling written by compile-schema is used only if it is newer
+    than the YAML source; otherwise the YAML is parsed and converted.
+    """
+    # Security: O_NOFOLLOW so a symlinked sibling is never read
+    try:
+        fd = os.open(str(schema_path.with_suffix(".json")), os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError:
+        fd = None
+    if fd is not None:
+        with os.fdopen(fd, "rb") as f:
+            st = os.fstat(f.fileno())
+            if stat.S_ISREG(st.st_mode) and st.st_mtime_ns > schema_path.stat().st_mtime_ns:
+                raw = f.read()
+                return orjson.loads(raw) if orjson else json.loads(raw)
+
+    # Convert YAML schema to JSON Schema format
+    return _to_plain(_load_yaml_plain(schema_path))
+
+
+def compile_schema(schema_path: Path) -> Path:
+    """Write the schema as a JSON sibling for fast loading by _load_schema.
+
+    Args:
+        schema_path: Path to templates.schema.yaml
+
+    Returns:
+        Path of the written .json file
+
+    Raises:
+        jsonschema.SchemaError: If the schema itself is invalid
+    """
+    import jsonschema
+
+    schema_dict = _to_plain(_load_yaml_plain(schema_path))
+    jsonschema.Draft7Validator.check_schema(schema_dict)
+
+    json_path = schema_path.with_suffix(".json")
+    fd, temp_path = tempfile.mkstemp(suffix=".json.tmp", dir=json_path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(schema_dict, f, indent=2)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, json_path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return json_path
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_schema_validator(
+    schema_path: str, mtime_ns: int, size: int
+) -> jsonschema.Draft7Validator:
+    """Build a validator for a schema file version (keyed by mtime and size)."""
+    import jsonschema
+
+    schema_dict = _load_schema(Path(schema_path))
+    jsonschema.Draft7Validator.check_schema(schema_dict)
+
+    # Create validator with disabled $ref resolution to prevent SSRF
+    resolver = _no_remote_ref_resolver().from_schema(schema_dict)
+    return jsonschema.Draft7Validator(schema_dict, resolver=resolver)
+
+
+def get_schema_validator(schema_path: Path) -> jsonschema.Draft7Validator:
+    """Return a compiled validator for schema_path, reused until the file changes.
+
+    Raises jsonschema.SchemaError if the schema itself is invalid.
+    """
+    st = schema_path.stat()
+    return _compile_schema_validator(str(schema_path), st.st_mtime_ns, st.st_size)
+
+
+def _refuse_remote_ref(uri: str):
+    raise ValueError(f"Remote $ref resolution disabled for security: {uri}")
+
+
+class _RefuseAllSchemes(dict):
+    """fastjsonschema handler map that claims every URI scheme (SSRF prevention).
+
+    fastjsonschema falls back to urlopen() for schemes without a handler, so
+    every scheme must resolve to _refuse_remote_ref.
+    """
+
+    def __contains__(self, scheme) -> bool:
+        return True
+
+    def __getitem__(self, scheme):
+        return _refuse_remote_ref
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_fast_schema_validator(
+    schema_path: str, mtime_ns: int, size: int
+) -> Callable[[Any], bool] | None:
+    """Generate a fastjsonschema check for a schema file version, if possible.
+
+    Returns None when fastjsonschema is not installed or cannot compile the
+    schema; callers then use the jsonschema validator alone.
+    """
+    try:
+        import fastjsonschema
+    except ImportError:
+        return None
+
+    try:
+        check = fastjsonschema.compile(
+            _load_schema(Path(schema_path)), handlers=_RefuseAllSchemes()
+        )
+    except Exception:
+        return None
+
+    def is_valid(instance: Any) -> bool:
+        try:
+            check(instance)
+        except fastjsonschema.JsonSchemaException:
+            return False
+        return True
+
+    return is_valid
+
+
+def get_fast_schema_validator(schema_path: Path) -> Callable[[Any], bool] | None:
+    """Return a generated is_valid() check for schema_path (see above), or None."""
+    try:
+        st = schema_path.stat()
+    except OSError:
+        return None
+    return _compile_fast_schema_validator(str(schema_path), st.st_mtime_ns, st.st_size)
+
 
 def validate_schema(templates_path: Path, schema_path: Path) -> list[str]:
     """Validate templates.yaml against JSON Schema (Level 1).
@@ -238,36 +605,53 @@ def validate_schema(templates_path: Path, schema_path: Path) -> list[str]:
     Returns:
         List of error messages (empty if valid)
     """
-    errors = []
-
     try:
         templates_data = load_yaml(templates_path)
-        schema_data = load_yaml(schema_path)
     except Exception as e:
         return [f"Failed to load YAML: {e}"]
 
-    # Convert YAML schema to JSON Schema format
-    # ruamel.yaml returns CommentedMap, convert to dict for jsonschema
-    # Use SafeJSONEncoder to handle datetime objects
-    schema_dict = json.loads(json.dumps(dict(schema_data), cls=SafeJSONEncoder))
-    templates_dict = json.loads(json.dumps(dict(templates_data), cls=SafeJSONEncoder))
+    return validate_schema_data(templates_data, schema_path)
 
-    # Create validator with disabled $ref resolution to prevent SSRF
-    # Using a resolver that refuses to resolve remote references
-    from jsonschema import RefResolver
 
-    class NoRemoteRefResolver(RefResolver):
-        """Resolver that refuses to fetch remote references (SSRF prevention)."""
+def validate_schema_data(templates_data: dict[str, Any], schema_path: Path) -> list[str]:
+    """Validate already-loaded templates data against JSON Schema (Level 1).
 
-        def resolve_remote(self, uri):
-            raise jsonschema.RefResolutionError(
-                f"Remote $ref resolution disabled for security: {uri}"
-            )
+    Args:
+        templates_data: Parsed templates.yaml contents (see load_yaml)
+        schema_path: Path to templates.schema.yaml
+
+    Returns:
+        List of error messages (empty if valid)
+    """
+    errors = []
+
+    # YAML may contain dates/datetimes, which JSON Schema sees as strings
+    templates_dict = _to_plain(templates_data)
+
+    # Fastest path: code generated by fastjsonschema (when installed) accepts
+    # valid documents without importing jsonschema. Anything it rejects is
+    # re-checked below, so jsonschema alone decides what counts as an error.
+    fast_is_valid = get_fast_schema_validator(schema_path)
+    if fast_is_valid is not None and fast_is_valid(templates_dict):
+        return errors
+
+    import jsonschema
 
-    resolver = NoRemoteRefResolver.from_schema(schema_dict)
-    validator = jsonschema.Draft7Validator(schema_dict, resolver=resolver)
+    try:
+        validator = get_schema_validator(schema_path)
+    except jsonschema.SchemaError as e:
+        return [f"Invalid schema {schema_path}: {e.message}"]
+    except Exception as e:
+        return [f"Failed to load YAML: {e}"]
+
+    # Fast path: is_valid stops at the first failure and builds no error objects
+    if validator.is_valid(templates_dict):
+        return errors
+
+    join = ".".join
     for error in validator.iter_errors(templates_dict):
-        path = ".".join(str(p) for p in error.absolute_path) if error.absolute_path else "root"
+        absolute_path = error.absolute_path
+        path = join(map(str, absolute_path)) if absolute_path else "root"
         errors.append(f"Schema error at {path}: {error.message}")
 
     return errors
@@ -292,43 +676,75 @@ def validate_semantic(
     Returns:
         List of error messages, or (errors, warnings) tuple if return_warnings=True
     """
-    errors = []
-    warnings = []
-
     try:
         data = load_yaml(templates_path)
     except Exception as e:
-        errors.append(f"Failed to load YAML: {e}")
+        errors = [f"Failed to load YAML: {e}"]
         if return_warnings:
-            return errors, warnings
+            return errors, []
         return errors
 
-    # Get category IDs (safely handle categories without 'id' field or explicit null)
-    categories = data.get("categories") or []
-    category_ids = {cat.get("id") for cat in categories if isinstance(cat, dict) and cat.get("id")}
+    return validate_semantic_data(data, return_warnings=return_warnings)
+
+
+def validate_semantic_data(
+    data: dict[str, Any],
+    return_warnings: bool = False
+) -> list[str] | tuple[list[str], list[str]]:
+    """Validate semantic constraints (Level 2) on already-loaded data.
+
+    See validate_semantic for the checks performed.
+
+    Args:
+        data: Parsed templates.yaml contents (see load_yaml)
+        return_warnings: If True, return (errors, warnings) tuple
+
+    Returns:
+        List of error messages, or (errors, warnings) tuple if return_warnings=True
+    """
+    errors = []
+    warnings = []
 
-    # Get templates and pre-compute all template IDs for O(n) relates_to validation
     # Use 'or []' to handle explicit null values (e.g., templates: null)
     templates = data.get("templates") or []
-    all_template_ids = {t.get("id") for t in templates if isinstance(t, dict)}
+    if not templates:
+        # Nothing to check; skip building the indices
+        return (errors, warnings) if return_warnings else errors
+
+    # Pre-compute category and template IDs for O(n) reference validation
+    # (safely handles missing 'id' fields and explicit null values)
+    index = _build_registry_indices(data)
+    category_ids = index.category_ids
+    all_template_ids = index.by_id
+    # Tracked separately from by_id, which skips null IDs
     seen_ids = set()
 
+    # Bound methods for the per-template loop
+    add_error = errors.append
+    add_warning = warnings.append
+
     for i, template in enumerate(templates):
         if not isinstance(template, dict):
-            errors.append(f"Template at index {i} is not a valid object")
+            add_error(f"Template at index {i} is not a valid object")
             continue
 
-        template_id = template.get("id", f"<unknown at index {i}>")
+        if "id" in template:
+            template_id = template["id"]
+            # Check ID format here too, so semantic-only callers catch it
+            if isinstance(template_id, str) and not TEMPLATE_ID_PATTERN.fullmatch(template_id):
+                add_error(f"Invalid template ID '{template_id}': {TEMPLATE_ID_ERROR}")
+        else:
+            template_id = f"<unknown at index {i}>"
 
         # Check for duplicate IDs
         if template_id in seen_ids:
-            errors.append(f"Duplicate template ID: '{template_id}'")
+            add_error(f"Duplicate template ID: '{template_id}'")
         seen_ids.add(template_id)
 
         # Check category reference
         category = template.get("category")
         if category and category not in category_ids:
-            errors.append(
+            add_error(
                 f"Template '{template_id}' references non-existent category: '{category}'"
             )
 
@@ -337,13 +753,13 @@ def validate_semantic(
         relates_to = template.get("relates_to") or []
         for idx, rel in enumerate(relates_to):
             if not isinstance(rel, dict):
-                errors.append(
+                add_error(
                     f"Template '{template_id}' has invalid relates_to entry at index {idx}: expected dict, got {type(rel).__name__}"
                 )
                 continue
             ref_id = rel.get("template_id")
             if ref_id and ref_id not in all_template_ids:
-                errors.append(
+                add_error(
                     f"Template '{template_id}' relates_to non-existent template: '{ref_id}'"
                 )
 
@@ -353,7 +769,7 @@ def validate_semantic(
         if isinstance(links, dict):
             for link_name, url in links.items():
                 if isinstance(url, str) and url.startswith("http://"):
-                    warnings.append(
+                    add_warning(
                         f"Template '{template_id}' has HTTP URL in {link_name}: {url} (should be HTTPS)"
                     )
 
@@ -465,18 +881,48 @@ def validate_network(
     return warnings
 
 
-def validate(templates_path: Path, schema_path: Path) -> ValidationResult:
+def validate(
+    templates_path: Path, schema_path: Path, fail_fast: bool = False
+) -> ValidationResult:
     """Run all validation levels.
 
     Args:
         templates_path: Path to templates.yaml
         schema_path: Path to templates.schema.yaml
+        fail_fast: If True, skip semantic validation when schema validation fails
 
     Returns:
         ValidationResult with all errors and warnings
     """
-    schema_errors = validate_schema(templates_path, schema_path)
-    semantic_errors, warnings = validate_semantic(templates_path, return_warnings=True)
+    # Parse once and share the data between both levels
+    try:
+        templates_data = load_yaml(templates_path)
+    except Exception as e:
+        error = f"Failed to load YAML: {e}"
+        return ValidationResult(success=False, schema_errors=[error], semantic_errors=[error])
+
+    return validate_data(templates_data, schema_path, fail_fast=fail_fast)
+
+
+def validate_data(
+    templates_data: dict[str, Any], schema_path: Path, fail_fast: bool = False
+) -> ValidationResult:
+    """Run all validation levels on already-loaded data.
+
+    Args:
+        templates_data: Parsed registry, e.g. from load_yaml or WriteResult.data
+        schema_path: Path to templates.schema.yaml
+        fail_fast: If True, skip semantic validation when schema validation fails
+
+    Returns:
+        ValidationResult with all errors and warnings
+    """
+    schema_errors = validate_schema_data(templates_data, schema_path)
+    if fail_fast and schema_errors:
+        # Semantic checks on a structurally invalid document are mostly noise
+        return ValidationResult(success=False, schema_errors=schema_errors)
+
+    semantic_errors, warnings = validate_semantic_data(templates_data, return_warnings=True)
 
     return ValidationResult(
         success=len(schema_errors) == 0 and len(semantic_errors) == 0,
@@ -486,8 +932,49 @@ def validate(templates_path: Path, schema_path: Path) -> ValidationResult:
     )
 
 
-def add_template(
-    templates_path: Path,
+def _build_registry_indices(data: dict[str, Any]) -> RegistryIndex:
+    """Index template positions, reverse relates_to references and category IDs.
+
+    Args:
+        data: Parsed templates.yaml contents
+
+    Returns:
+        RegistryIndex where by_id maps each template ID to its list index
+        (first occurrence wins) and referenced_by maps each template ID to
+        the IDs of templates whose relates_to names it.
+    """
+    index = RegistryIndex()
+    for cat in data.get("categories") or []:
+        if isinstance(cat, dict) and cat.get("id"):
+            index.category_ids.add(cat["id"])
+
+    for i, t in enumerate(data.get("templates") or []):
+        if not isinstance(t, dict):
+            continue
+        if t.get("id") is not None:
+            index.by_id.setdefault(t["id"], i)
+        for rel in t.get("relates_to") or []:
+            if isinstance(rel, dict) and rel.get("template_id"):
+                index.referenced_by.setdefault(rel["template_id"], []).append(
+                    t.get("id", "<unknown>")
+                )
+    return index
+
+
+def _identifier_error(template_id: str, repo_owner: str, repo_name: str) -> WriteResult | None:
+    """Return a failed WriteResult if any identifier is malformed, else None."""
+    identifier_errors = _validate_identifiers(template_id, repo_owner, repo_name)
+    if not identifier_errors:
+        return None
+    return WriteResult(
+        success=False,
+        errors=list(identifier_errors.values()),
+        error_codes=frozenset(identifier_errors),
+    )
+
+
+def _apply_add(
+    data: dict[str, Any],
     template_id: str,
     repo_owner: str,
     repo_name: str,
@@ -498,99 +985,46 @@ def add_template(
     tags: list[str] | None = None,
     features: list[str] | None = None,
 ) -> WriteResult:
-    """Add a new template to the registry.
-
-    Args:
-        templates_path: Path to templates.yaml
-        template_id: Unique template identifier
-        repo_owner: GitHub repository owner
-        repo_name: GitHub repository name
-        title: Display title
-        description: Brief description
-        category: Category ID reference
-        tier: Template tier (starter, production, stable, beta, experimental)
-        tags: Optional list of tags
-        features: Optional list of features
+    """Append a new template to a loaded round-trip registry (no I/O).
 
-    Returns:
-        WriteResult indicating success or failure
+    Identifiers must already have passed _identifier_error(). data is only
+    modified when the returned result is successful.
     """
-    errors = []
-    warnings = []
-
-    # Validate template ID format
-    if not TEMPLATE_ID_PATTERN.match(template_id):
-        errors.append(
-            f"Invalid template ID '{template_id}': must be lowercase letters, numbers, "
-            "and hyphens, starting with a letter"
-        )
-        return WriteResult(success=False, errors=errors)
-
-    # Validate repo_owner (security: prevent injection)
-    if not GITHUB_OWNER_PATTERN.match(repo_owner):
-        errors.append(
-            f"Invalid repo owner '{repo_owner}': must be 1-39 alphanumeric characters or hyphens, "
-            "cannot start or end with hyphen"
-        )
-        return WriteResult(success=False, errors=errors)
-
-    # Validate repo_name (security: prevent injection)
-    if not GITHUB_REPO_PATTERN.match(repo_name):
-        errors.append(
-            f"Invalid repo name '{repo_name}': must be 1-100 alphanumeric characters, hyphens, "
-            "underscores, or dots"
-        )
-        return WriteResult(success=False, errors=errors)
-
-    try:
-        data = load_yaml_raw(templates_path)
-    except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to load YAML: {e}"])
-
-    # Handle None data
-    if data is None:
-        data = {}
-
-    # Get existing templates and categories
+    # Get existing templates and index IDs/categories
     templates = data.get("templates") or []
-    categories = data.get("categories") or []
+    index = _build_registry_indices(data)
 
     # Check for duplicate ID
-    existing_ids = {t.get("id") for t in templates if isinstance(t, dict)}
-    if template_id in existing_ids:
-        errors.append(f"Template with ID '{template_id}' already exists")
-        return WriteResult(success=False, errors=errors)
+    if template_id in index.by_id:
+        return _write_error(ERR_DUPLICATE_ID, f"Template with ID '{template_id}' already exists")
 
     # Check category exists
-    category_ids = {c.get("id") for c in categories if isinstance(c, dict)}
-    if category not in category_ids:
-        errors.append(f"Category '{category}' does not exist")
-        return WriteResult(success=False, errors=errors)
+    if category not in index.category_ids:
+        return _write_error(ERR_INVALID_CATEGORY, f"Category '{category}' does not exist")
 
-    # Build new template entry
+    # Build new template entry in one shot from (key, value) pairs
     from ruamel.yaml.comments import CommentedMap, CommentedSeq
 
-    new_template = CommentedMap()
-    new_template["id"] = template_id
-    new_template["repo"] = CommentedMap([("owner", repo_owner), ("name", repo_name)])
-    new_template["title"] = title
-    new_template["description"] = description
-    new_template["category"] = category
-    new_template["tier"] = tier
-
-    # Add directories with minimal required structure
     docs_entry = CommentedMap([("path", "README.md"), ("target", "overview.md")])
-    new_template["directories"] = CommentedMap([("docs", CommentedSeq([docs_entry]))])
-
+    pairs = [
+        ("id", template_id),
+        ("repo", CommentedMap([("owner", repo_owner), ("name", repo_name)])),
+        ("title", title),
+        ("description", description),
+        ("category", category),
+        ("tier", tier),
+        # Add directories with minimal required structure
+        ("directories", CommentedMap([("docs", CommentedSeq([docs_entry]))])),
+    ]
     if tags:
-        new_template["tags"] = CommentedSeq(tags)
+        pairs.append(("tags", CommentedSeq(tags)))
     if features:
-        new_template["features"] = CommentedSeq(features)
-
+        pairs.append(("features", CommentedSeq(features)))
     # Add links
-    new_template["links"] = CommentedMap([
+    pairs.append(("links", CommentedMap([
         ("github", f"https://github.com/{repo_owner}/{repo_name}")
-    ])
+    ])))
+    new_template = CommentedMap(pairs)
 
     # Append to templates list
     if not isinstance(templates, list):
@@ -598,17 +1032,11 @@ def add_template(
     templates.append(new_template)
     data["templates"] = templates
 
-    # Save
-    try:
-        save_yaml(templates_path, data)
-    except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to save YAML: {e}"])
-
-    return WriteResult(success=True, warnings=warnings)
+    return WriteResult(success=True, data=data)
 
 
-def update_template(
-    templates_path: Path,
+def _apply_update(
+    data: dict[str, Any] | None,
     template_id: str,
     title: str | None = None,
     description: str | None = None,
@@ -617,56 +1045,31 @@ def update_template(
     tags: list[str] | None = None,
     features: list[str] | None = None,
 ) -> WriteResult:
-    """Update an existing template's fields.
-
-    Only fields that are provided (not None) will be updated.
-
-    Args:
-        templates_path: Path to templates.yaml
-        template_id: ID of template to update
-        title: New title (optional)
-        description: New description (optional)
-        category: New category (optional)
-        tier: New tier (optional)
-        tags: New tags (optional)
-        features: New features (optional)
+    """Update fields of a template in a loaded round-trip registry (no I/O).
 
-    Returns:
-        WriteResult indicating success or failure
+    data is only modified when the returned result is successful.
     """
-    errors = []
-    warnings = []
-
-    try:
-        data = load_yaml_raw(templates_path)
-    except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to load YAML: {e}"])
-
     if data is None:
-        return WriteResult(success=False, errors=["Templates file is empty"])
+        return _write_error(ERR_EMPTY_FILE, "Templates file is empty")
 
     templates = data.get("templates") or []
-    categories = data.get("categories") or []
-    category_ids = {c.get("id") for c in categories if isinstance(c, dict)}
+    index = _build_registry_indices(data)
 
     # Find template
-    template_index = None
-    for i, t in enumerate(templates):
-        if isinstance(t, dict) and t.get("id") == template_id:
-            template_index = i
-            break
+    template_index = index.by_id.get(template_id)
 
     if template_index is None:
-        return WriteResult(success=False, errors=[f"Template '{template_id}' not found"])
+        return _write_error(ERR_NOT_FOUND, f"Template '{template_id}' not found")
 
     template = templates[template_index]
 
     # Validate category if changing
-    if category is not None and category not in category_ids:
-        errors.append(f"Category '{category}' does not exist")
-        return WriteResult(success=False, errors=errors)
+    if category is not None and category not in index.category_ids:
+        return _write_error(ERR_INVALID_CATEGORY, f"Category '{category}' does not exist")
 
     # Update fields
+    from ruamel.yaml.comments import CommentedSeq
+
     if title is not None:
         template["title"] = title
     if description is not None:
@@ -676,19 +1079,145 @@ def update_template(
     if tier is not None:
         template["tier"] = tier
     if tags is not None:
-        from ruamel.yaml.comments import CommentedSeq
         template["tags"] = CommentedSeq(tags)
     if features is not None:
-        from ruamel.yaml.comments import CommentedSeq
         template["features"] = CommentedSeq(features)
 
-    # Save
+    return WriteResult(success=True, data=data)
+
+
+def _apply_remove(data: dict[str, Any] | None, template_id: str, force: bool = False) -> WriteResult:
+    """Remove a template from a loaded round-trip registry (no I/O).
+
+    data is only modified when the returned result is successful.
+    """
+    if data is None:
+        return _write_error(ERR_EMPTY_FILE, "Templates file is empty")
+
+    templates = data.get("templates") or []
+    index = _build_registry_indices(data)
+
+    # Find template index
+    template_index = index.by_id.get(template_id)
+
+    if template_index is None:
+        return _write_error(ERR_NOT_FOUND, f"Template '{template_id}' not found")
+
+    # Check for references from other templates
+    if not force:
+        referencing = index.referenced_by.get(template_id, [])
+        if referencing:
+            warning = (
+                f"Template '{template_id}' is referenced by: {', '.join(referencing)}. "
+                "Use --force to remove anyway."
+            )
+            return WriteResult(success=False, errors=[], warnings=[warning])
+
+    # Remove template
+    del templates[template_index]
+    data["templates"] = templates
+
+    return WriteResult(success=True, data=data)
+
+
+def _save_result(templates_path: Path, result: WriteResult) -> WriteResult:
+    """Save a successful in-memory change; pass failures through unchanged."""
+    if not result.success:
+        return result
+    try:
+        save_yaml(templates_path, result.data)
+    except Exception as e:
+        return _write_error(ERR_SAVE_FAILED, f"Failed to save YAML: {e}")
+    return result
+
+
+def add_template(
+    templates_path: Path,
+    template_id: str,
+    repo_owner: str,
+    repo_name: str,
+    title: str,
+    description: str,
+    category: str,
+    tier: str = "starter",
+    tags: list[str] | None = None,
+    features: list[str] | None = None,
+) -> WriteResult:
+    """Add a new template to the registry.
+
+    Args:
+        templates_path: Path to templates.yaml
+        template_id: Unique template identifier
+        repo_owner: GitHub repository owner
+        repo_name: GitHub repository name
+        title: Display title
+        description: Brief description
+        category: Category ID reference
+        tier: Template tier (starter, production, stable, beta, experimental)
+        tags: Optional list of tags
+        features: Optional list of features
+
+    Returns:
+        WriteResult indicating success or failure
+    """
+    # Validate template ID, repo owner and repo name formats
+    error = _identifier_error(template_id, repo_owner, repo_name)
+    if error:
+        return error
+
+    try:
+        data = load_yaml_raw(templates_path)
+    except Exception as e:
+        return _write_error(ERR_LOAD_FAILED, f"Failed to load YAML: {e}")
+
+    # Handle None data
+    if data is None:
+        data = {}
+
+    result = _apply_add(
+        data, template_id, repo_owner, repo_name, title, description, category,
+        tier=tier, tags=tags, features=features,
+    )
+    return _save_result(templates_path, result)
+
+
+def update_template(
+    templates_path: Path,
+    template_id: str,
+    title: str | None = None,
+    description: str | None = None,
+    category: str | None = None,
+    tier: str | None = None,
+    tags: list[str] | None = None,
+    features: list[str] | None = None,
+) -> WriteResult:
+    """Update an existing template's fields.
+
+    Only fields that are provided (not None) will be updated.
+
+    Args:
+        templates_path: Path to templates.yaml
+        template_id: ID of template to update
+        title: New title (optional)
+        description: New description (optional)
+        category: New category (optional)
+        tier: New tier (optional)
+        tags: New tags (optional)
+        features: New features (optional)
+
+    Returns:
+        WriteResult indicating success or failure
+    """
     try:
-        save_yaml(templates_path, data)
+        data = load_yaml_raw(templates_path)
     except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to save YAML: {e}"])
+        return _write_error(ERR_LOAD_FAILED, f"Failed to load YAML: {e}")
 
-    return WriteResult(success=True, warnings=warnings)
+    result = _apply_update(
+        data, template_id, title=title, description=description, category=category,
+        tier=tier, tags=tags, features=features,
+    )
+    return _save_result(templates_path, result)
 
 
 def remove_template(
@@ -706,63 +1235,105 @@ def remove_template(
     Returns:
         WriteResult indicating success or failure
     """
-    errors = []
-    warnings = []
-
     try:
         data = load_yaml_raw(templates_path)
     except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to load YAML: {e}"])
+        return _write_error(ERR_LOAD_FAILED, f"Failed to load YAML: {e}")
 
-    if data is None:
-        return WriteResult(success=False, errors=["Templates file is empty"])
+    result = _apply_remove(data, template_id, force=force)
+    return _save_result(templates_path, result)
 
-    templates = data.get("templates") or []
 
-    # Find template index
-    template_index = None
-    for i, t in enumerate(templates):
-        if isinstance(t, dict) and t.get("id") == template_id:
-            template_index = i
-            break
+class TemplateSession:
+    """Batch several add/update/remove operations into one load and one save.
 
-    if template_index is None:
-        return WriteResult(success=False, errors=[f"Template '{template_id}' not found"])
-
-    # Check for references from other templates
-    if not force:
-        referencing = []
-        for t in templates:
-            if not isinstance(t, dict):
-                continue
-            relates_to = t.get("relates_to") or []
-            for rel in relates_to:
-                if isinstance(rel, dict) and rel.get("template_id") == template_id:
-                    referencing.append(t.get("id", "<unknown>"))
-        if referencing:
-            warnings.append(
-                f"Template '{template_id}' is referenced by: {', '.join(referencing)}. "
-                "Use --force to remove anyway."
-            )
-            return WriteResult(success=False, errors=[], warnings=warnings)
+    The registry is parsed (round-trip, comments preserved) when the session
+    is created; add(), update() and remove() take the same arguments as
+    add_template(), update_template() and remove_template() minus the path,
+    apply to the in-memory document and return the same WriteResults. A
+    failed operation leaves the document untouched. Nothing is written
+    until commit().
 
-    # Remove template
-    del templates[template_index]
-    data["templates"] = templates
+    Example:
+        session = TemplateSession(path)
+        session.add(template_id="new", ...)
+        session.remove("old", force=True)
+        result = session.commit()
 
-    # Save
-    try:
-        save_yaml(templates_path, data)
-    except Exception as e:
-        return WriteResult(success=False, errors=[f"Failed to save YAML: {e}"])
+    Raises (from the constructor) whatever load_yaml_raw raises, e.g.
+    ValueError for symlinks or OSError for unreadable files.
+    """
 
-    return WriteResult(success=True, warnings=warnings)
+    def __init__(self, templates_path: Path):
+        self.templates_path = templates_path
+        self.data = load_yaml_raw(templates_path)
+        self._dirty = False
+
+    def _track(self, result: WriteResult) -> WriteResult:
+        if result.success:
+            self._dirty = True
+        return result
+
+    def add(
+        self,
+        template_id: str,
+        repo_owner: str,
+        repo_name: str,
+        title: str,
+        description: str,
+        category: str,
+        tier: str = "starter",
+        tags: list[str] | None = None,
+        features: list[str] | None = None,
+    ) -> WriteResult:
+        """Add a template in memory (see add_template)."""
+        error = _identifier_error(template_id, repo_owner, repo_name)
+        if error:
+            return error
+        if self.data is None:
+            self.data = {}
+        return self._track(_apply_add(
+            self.data, template_id, repo_owner, repo_name, title, description, category,
+            tier=tier, tags=tags, features=features,
+        ))
+
+    def update(
+        self,
+        template_id: str,
+        title: str | None = None,
+        description: str | None = None,
+        category: str | None = None,
+        tier: str | None = None,
+        tags: list[str] | None = None,
+        features: list[str] | None = None,
+    ) -> WriteResult:
+        """Update a template in memory (see update_template)."""
+        return self._track(_apply_update(
+            self.data, template_id, title=title, description=description, category=category,
+            tier=tier, tags=tags, features=features,
+        ))
+
+    def remove(self, template_id: str, force: bool = False) -> WriteResult:
+        """Remove a template in memory (see remove_template)."""
+        return self._track(_apply_remove(self.data, template_id, force=force))
+
+    def commit(self) -> WriteResult:
+        """Write all successful changes with a single save_yaml() call.
+
+        A session with no successful changes does not touch the file.
+        """
+        if not self._dirty:
+            return WriteResult(success=True, data=self.data)
+        result = _save_result(self.templates_path, WriteResult(success=True, data=self.data))
+        if result.success:
+            self._dirty = False
+        return result
 
 
 def cmd_validate(args: argparse.Namespace) -> int:
     """Handle the validate subcommand."""
-    templates_path = Path(args.templates) if args.templates else DEFAULT_TEMPLATES_PATH
-    schema_path = Path(args.schema) if args.schema else DEFAULT_SCHEMA_PATH
+    templates_path = args.templates
+    schema_path = args.schema
 
     if not templates_path.exists():
         print(f"Error: Templates file not found: {templates_path}", file=sys.stderr)
@@ -772,7 +1343,7 @@ def cmd_validate(args: argparse.Namespace) -> int:
         print(f"Error: Schema file not found: {schema_path}", file=sys.stderr)
         return 1
 
-    result = validate(templates_path, schema_path)
+    result = validate(templates_path, schema_path, fail_fast=not args.all_errors)
 
     if result.schema_errors:
         print("Schema validation errors:", file=sys.stderr)
@@ -811,7 +1382,7 @@ def cmd_validate(args: argparse.Namespace) -> int:
 
 def cmd_list(args: argparse.Namespace) -> int:
     """Handle the list subcommand."""
-    templates_path = Path(args.templates) if hasattr(args, 'templates') and args.templates else DEFAULT_TEMPLATES_PATH
+    templates_path = args.templates
 
     if not templates_path.exists():
         print(f"Error: Templates file not found: {templates_path}", file=sys.stderr)
@@ -824,59 +1395,58 @@ def cmd_list(args: argparse.Namespace) -> int:
         return 1
 
     # Use 'or []' to handle explicit null values (e.g., templates: null)
-    # Filter for only dict items to handle malformed data gracefully
+    # Filter for only dict items and apply filters in a single lazy pass
     raw_templates = data.get("templates") or []
-    templates = [t for t in raw_templates if isinstance(t, dict)]
-
-    # Apply filters
-    if args.category:
-        templates = [t for t in templates if t.get("category") == args.category]
-
-    if args.tier:
-        templates = [t for t in templates if t.get("tier") == args.tier]
+    templates = (
+        t for t in raw_templates
+        if isinstance(t, dict)
+        and (not args.category or t.get("category") == args.category)
+        and (not args.tier or t.get("tier") == args.tier)
+    )
 
     # Output format
     if args.format == "json":
-        # Convert to clean dict for JSON output
+        # Stream entries in the same layout as json.dumps(list, indent=2)
         # Handle None values safely for list fields
-        output = []
+        out = sys.stdout
+        count = 0
         for t in templates:
-            output.append({
+            entry = json.dumps({
                 "id": t.get("id"),
                 "title": t.get("title"),
                 "description": t.get("description"),
                 "category": t.get("category"),
                 "tier": t.get("tier"),
-                "tags": list(t.get("tags") or []),
-                "features": list(t.get("features") or []),
-            })
-        print(json.dumps(output, indent=2))
+                "tags": t.get("tags") or [],
+                "features": t.get("features") or [],
+            }, indent=2)
+            out.write(("[\n  " if count == 0 else ",\n  ") + entry.replace("\n", "\n  "))
+            count += 1
+        out.write("\n]\n" if count else "[]\n")
     else:
-        # Text format - human readable table
-        if not templates:
-            print("No templates found matching criteria.")
-            return 0
-
-        # Print header
-        print(f"{'ID':<30} {'Title':<35} {'Category':<20} {'Tier':<12}")
-        print("-" * 97)
-
+        # Text format - human readable table, written in one call
+        rows = []
         for t in templates:
             # Convert to string and handle None values for safe slicing
             template_id = str(t.get("id") or "unknown")[:30]
             title = str(t.get("title") or "Untitled")[:35]
             category = str(t.get("category") or "none")[:20]
             tier = str(t.get("tier") or "none")[:12]
-            print(f"{template_id:<30} {title:<35} {category:<20} {tier:<12}")
+            rows.append(f"{template_id:<30} {title:<35} {category:<20} {tier:<12}\n")
+
+        if not rows:
+            print("No templates found matching criteria.")
+            return 0
 
-        print(f"\nTotal: {len(templates)} template(s)")
+        header = f"{'ID':<30} {'Title':<35} {'Category':<20} {'Tier':<12}\n" + "-" * 97 + "\n"
+        sys.stdout.write(header + "".join(rows) + f"\nTotal: {len(rows)} template(s)\n")
 
     return 0
 
 
 def cmd_add(args: argparse.Namespace) -> int:
     """Handle the add subcommand."""
-    templates_path = Path(args.templates) if args.templates else DEFAULT_TEMPLATES_PATH
+    templates_path = args.templates
 
     if not templates_path.exists():
         print(f"Error: Templates file not found: {templates_path}", file=sys.stderr)
@@ -923,7 +1493,7 @@ def cmd_add(args: argparse.Namespace) -> int:
 
 def cmd_update(args: argparse.Namespace) -> int:
     """Handle the update subcommand."""
-    templates_path = Path(args.templates) if args.templates else DEFAULT_TEMPLATES_PATH
+    templates_path = args.templates
 
     if not templates_path.exists():
         print(f"Error: Templates file not found: {templates_path}", file=sys.stderr)
@@ -961,7 +1531,7 @@ def cmd_update(args: argparse.Namespace) -> int:
 
 def cmd_remove(args: argparse.Namespace) -> int:
     """Handle the remove subcommand."""
-    templates_path = Path(args.templates) if args.templates else DEFAULT_TEMPLATES_PATH
+    templates_path = args.templates
 
     if not templates_path.exists():
         print(f"Error: Templates file not found: {templates_path}", file=sys.stderr)
@@ -988,25 +1558,45 @@ def cmd_remove(args: argparse.Namespace) -> int:
         return 1
 
 
-def main() -> int:
-    """Main entry point for the CLI."""
-    parser = argparse.ArgumentParser(
-        prog="template_manager",
-        description="Manage templates.yaml registry entries with schema validation.",
-    )
-    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+def cmd_compile_schema(args: argparse.Namespace) -> int:
+    """Handle the compile-schema subcommand."""
+    import jsonschema
+
+    schema_path = args.schema
+
+    if not schema_path.exists():
+        print(f"Error: Schema file not found: {schema_path}", file=sys.stderr)
+        return 1
+
+    try:
+        json_path = compile_schema(schema_path)
+    except jsonschema.SchemaError as e:
+        print(f"Error: Invalid schema {schema_path}: {e.message}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error compiling schema: {e}", file=sys.stderr)
+        return 1
 
-    # validate subcommand
+    print(f"Wrote {json_path}")
+    return 0
+
+
+def _add_validate_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the validate subcommand."""
     validate_parser = subparsers.add_parser(
         "validate",
         help="Validate templates.yaml against schema",
     )
     validate_parser.add_argument(
         "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATES_PATH,
         help=f"Path to templates.yaml (default: {DEFAULT_TEMPLATES_PATH})",
     )
     validate_parser.add_argument(
         "--schema",
+        type=Path,
+        default=DEFAULT_SCHEMA_PATH,
         help=f"Path to schema file (default: {DEFAULT_SCHEMA_PATH})",
     )
     validate_parser.add_argument(
@@ -1014,9 +1604,16 @@ def main() -> int:
         action="store_true",
         help="Include network checks (URL reachability)",
     )
+    validate_parser.add_argument(
+        "--all-errors",
+        action="store_true",
+        help="Run semantic checks even when schema validation fails",
+    )
     validate_parser.set_defaults(func=cmd_validate)
 
-    # list subcommand
+
+def _add_list_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the list subcommand."""
     list_parser = subparsers.add_parser(
         "list",
         help="List templates in the registry",
@@ -1033,15 +1630,19 @@ def main() -> int:
     )
     list_parser.add_argument(
         "--tier",
-        help="Filter by tier (starter, production, stable, beta, experimental)",
+        help=f"Filter by tier ({', '.join(TIERS)})",
     )
     list_parser.add_argument(
         "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATES_PATH,
         help=f"Path to templates.yaml (default: {DEFAULT_TEMPLATES_PATH})",
     )
     list_parser.set_defaults(func=cmd_list)
 
-    # add subcommand
+
+def _add_add_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the add subcommand."""
     add_parser = subparsers.add_parser(
         "add",
         help="Add a new template to the registry",
@@ -1074,7 +1675,7 @@ def main() -> int:
     add_parser.add_argument(
         "--tier",
         default="starter",
-        choices=["starter", "production", "stable", "beta", "experimental"],
+        choices=TIERS,
         help="Template tier (default: starter)",
     )
     add_parser.add_argument(
@@ -1087,11 +1688,15 @@ def main() -> int:
     )
     add_parser.add_argument(
         "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATES_PATH,
         help=f"Path to templates.yaml (default: {DEFAULT_TEMPLATES_PATH})",
     )
     add_parser.set_defaults(func=cmd_add)
 
-    # update subcommand
+
+def _add_update_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the update subcommand."""
     update_parser = subparsers.add_parser(
         "update",
         help="Update an existing template",
@@ -1114,7 +1719,7 @@ def main() -> int:
     )
     update_parser.add_argument(
         "--tier",
-        choices=["starter", "production", "stable", "beta", "experimental"],
+        choices=TIERS,
         help="New tier",
     )
     update_parser.add_argument(
@@ -1127,11 +1732,15 @@ def main() -> int:
     )
     update_parser.add_argument(
         "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATES_PATH,
         help=f"Path to templates.yaml (default: {DEFAULT_TEMPLATES_PATH})",
     )
     update_parser.set_defaults(func=cmd_update)
 
-    # remove subcommand
+
+def _add_remove_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the remove subcommand."""
     remove_parser = subparsers.add_parser(
         "remove",
         help="Remove a template from the registry",
@@ -1147,11 +1756,74 @@ def main() -> int:
     )
     remove_parser.add_argument(
         "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATES_PATH,
         help=f"Path to templates.yaml (default: {DEFAULT_TEMPLATES_PATH})",
     )
     remove_parser.set_defaults(func=cmd_remove)
 
-    args = parser.parse_args()
+
+def _add_compile_schema_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the compile-schema subcommand."""
+    compile_parser = subparsers.add_parser(
+        "compile-schema",
+        help="Write the schema as JSON next to it for faster validation",
+    )
+    compile_parser.add_argument(
+        "--schema",
+        type=Path,
+        default=DEFAULT_SCHEMA_PATH,
+        help=f"Path to schema file (default: {DEFAULT_SCHEMA_PATH})",
+    )
+    compile_parser.set_defaults(func=cmd_compile_schema)
+
+
+_SUBCOMMAND_PARSERS = {
+    "validate": _add_validate_parser,
+    "list": _add_list_parser,
+    "add": _add_add_parser,
+    "update": _add_update_parser,
+    "remove": _add_remove_parser,
+    "compile-schema": _add_compile_schema_parser,
+}
+
+
+@functools.cache
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """Build the CLI argument parser (once per process and command).
+
+    When command names a known subcommand, only that subparser is built;
+    otherwise (no command, --help, typos) all of them are, so help and
+    "invalid choice" errors list every command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="template_manager",
+        description="Manage templates.yaml registry entries with schema validation.",
+    )
+    subparsers = parser.add_subparsers(dest="command", help="Available commands")
+
+    if command in _SUBCOMMAND_PARSERS:
+        _SUBCOMMAND_PARSERS[command](subparsers)
+    else:
+        for add_subparser in _SUBCOMMAND_PARSERS.values():
+            add_subparser(subparsers)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Main entry point for the CLI.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = build_parser(argv[0] if argv else None)
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
@@ -1,8 +1,11 @@
 """Shared fixtures for template manager tests."""
 
+import argparse
+import hashlib
 import json
+import os
+import shutil
 import sys
-import tempfile
 from pathlib import Path
 
 import pytest
@@ -13,7 +16,144 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
-@pytest.fixture
+# Canonical registry files for the write-operation tests, encoded once at import
+EMPTY_TEMPLATES_YAML = b'''version: "1.0"
+
+categories:
+  - id: test-category
+    name: "Test Category"
+
+templates: []
+'''
+
+SINGLE_TEMPLATE_YAML = b'''version: "1.0"
+
+categories:
+  - id: test-category
+    name: "Test Category"
+
+templates:
+  - id: test-template
+    repo:
+      owner: "test-org"
+      name: "test-repo"
+    title: "Original Title"
+    description: "Original description"
+    category: test-category
+    tier: starter
+    tags:
+      - tag1
+      - tag2
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+'''
+
+TWO_TEMPLATES_YAML = b'''version: "1.0"
+
+categories:
+  - id: test-category
+    name: "Test Category"
+
+templates:
+  - id: template-to-remove
+    repo:
+      owner: "test-org"
+      name: "test-repo"
+    title: "To Remove"
+    description: "Will be removed"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+  - id: template-to-keep
+    repo:
+      owner: "test-org"
+      name: "another-repo"
+    title: "To Keep"
+    description: "Will remain"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+'''
+
+REFERENCED_TEMPLATES_YAML = b'''version: "1.0"
+
+categories:
+  - id: test-category
+    name: "Test Category"
+
+templates:
+  - id: referenced-template
+    repo:
+      owner: "test-org"
+      name: "test-repo"
+    title: "Referenced"
+    description: "Other templates reference this"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+  - id: first-referrer
+    repo:
+      owner: "test-org"
+      name: "repo-1"
+    title: "First"
+    description: "References the target"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+    relates_to:
+      - template_id: referenced-template
+        relationship: production_version
+  - id: second-referrer
+    repo:
+      owner: "test-org"
+      name: "repo-2"
+    title: "Second"
+    description: "Also references the target"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+    relates_to:
+      - template_id: first-referrer
+        relationship: alternative
+      - template_id: referenced-template
+        relationship: alternative
+'''
+
+CANONICAL_TEMPLATES = {
+    "empty": EMPTY_TEMPLATES_YAML,
+    "single": SINGLE_TEMPLATE_YAML,
+    "two": TWO_TEMPLATES_YAML,
+    "referenced": REFERENCED_TEMPLATES_YAML,
+}
+
+
+def pytest_configure(config):
+    """Put tmp_path directories on RAM-backed /dev/shm when it is available.
+
+    Only the temp root moves: pytest still creates its numbered
+    /dev/shm/pytest-of-<user>/pytest-N directories and keeps the usual
+    last runs for inspection. An explicit --basetemp (including the
+    per-worker one pytest-xdist passes down) or PYTEST_DEBUG_TEMPROOT wins.
+    """
+    shm = Path("/dev/shm")
+    if config.option.basetemp or not (shm.is_dir() and os.access(shm, os.W_OK)):
+        return
+    os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", str(shm))
+
+
+@pytest.fixture(scope="session")
 def yaml_handler():
     """Create a YAML handler configured for comment preservation."""
     yaml = YAML()
@@ -22,25 +162,44 @@ def yaml_handler():
     return yaml
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def project_root() -> Path:
     """Return the project root directory."""
     return Path(__file__).parent.parent
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def subcommand_parsers() -> dict[str, argparse.ArgumentParser]:
+    """Return the registered subcommand parsers, keyed by command name."""
+    from scripts.template_manager import build_parser
+
+    parser = build_parser()
+    subparsers = next(
+        action for action in parser._actions
+        if isinstance(action, argparse._SubParsersAction)
+    )
+    return subparsers.choices
+
+
+@pytest.fixture(scope="session")
+def available_subcommands(subcommand_parsers) -> frozenset[str]:
+    """Return the subcommand names registered on the CLI parser."""
+    return frozenset(subcommand_parsers)
+
+
+@pytest.fixture(scope="session")
 def templates_yaml_path(project_root) -> Path:
     """Return the path to templates.yaml."""
     return project_root / "templates.yaml"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def schema_yaml_path(project_root) -> Path:
     """Return the path to templates.schema.yaml."""
     return project_root / "templates.schema.yaml"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def valid_templates_yaml(yaml_handler) -> str:
     """Return valid templates.yaml content as string."""
     return '''# yaml-language-server: $schema=./templates.schema.yaml
@@ -74,7 +233,7 @@ templates:
 '''
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def invalid_missing_required_field_yaml() -> str:
     """Return templates.yaml missing required fields."""
     return '''version: "1.0"
@@ -88,7 +247,7 @@ templates:
 '''
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def invalid_duplicate_ids_yaml() -> str:
     """Return templates.yaml with duplicate IDs."""
     return '''version: "1.0"
@@ -124,7 +283,7 @@ templates:
 '''
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def invalid_category_reference_yaml() -> str:
     """Return templates.yaml with invalid category reference."""
     return '''version: "1.0"
@@ -148,7 +307,7 @@ templates:
 '''
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def invalid_id_pattern_yaml() -> str:
     """Return templates.yaml with invalid ID pattern."""
     return '''version: "1.0"
@@ -172,7 +331,26 @@ templates:
 '''
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def invalid_type_yaml() -> str:
+    """Return templates.yaml with a wrongly typed field."""
+    return '''version: "1.0"
+templates:
+  - id: "test"
+    repo:
+      owner: "test-org"
+      name: "test-repo"
+    title: 123  # Should be string
+    description: "Test"
+    category: "test"
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+'''
+
+
+@pytest.fixture(scope="session")
 def http_url_yaml() -> str:
     """Return templates.yaml with HTTP (not HTTPS) URL."""
     return '''version: "1.0"
@@ -198,6 +376,38 @@ templates:
 '''
 
 
+@pytest.fixture(scope="session")
+def valid_templates_dict(valid_templates_yaml) -> dict:
+    """Return valid_templates_yaml parsed once per session (treat as read-only)."""
+    from scripts.template_manager import get_yaml_handler_fast
+
+    return get_yaml_handler_fast().load(valid_templates_yaml)
+
+
+@pytest.fixture(scope="session")
+def invalid_duplicate_ids_dict(invalid_duplicate_ids_yaml) -> dict:
+    """Return invalid_duplicate_ids_yaml parsed once per session (treat as read-only)."""
+    from scripts.template_manager import get_yaml_handler_fast
+
+    return get_yaml_handler_fast().load(invalid_duplicate_ids_yaml)
+
+
+@pytest.fixture(scope="session")
+def invalid_category_reference_dict(invalid_category_reference_yaml) -> dict:
+    """Return invalid_category_reference_yaml parsed once per session (treat as read-only)."""
+    from scripts.template_manager import get_yaml_handler_fast
+
+    return get_yaml_handler_fast().load(invalid_category_reference_yaml)
+
+
+@pytest.fixture(scope="session")
+def http_url_dict(http_url_yaml) -> dict:
+    """Return http_url_yaml parsed once per session (treat as read-only)."""
+    from scripts.template_manager import get_yaml_handler_fast
+
+    return get_yaml_handler_fast().load(http_url_yaml)
+
+
 @pytest.fixture
 def temp_yaml_file(tmp_path):
     """Factory fixture for creating temporary YAML files."""
@@ -208,10 +418,97 @@ def temp_yaml_file(tmp_path):
     return _create_temp_yaml
 
 
+@pytest.fixture(scope="session")
+def _canonical_templates_dir(tmp_path_factory) -> Path:
+    """Write each canonical registry once per session."""
+    canonical_dir = tmp_path_factory.mktemp("canonical")
+    for name, content in CANONICAL_TEMPLATES.items():
+        (canonical_dir / f"{name}.yaml").write_bytes(content)
+    return canonical_dir
+
+
+def _materialize_templates_file(canonical_dir: Path, tmp_path: Path, name: str) -> Path:
+    """Give one test its own templates.yaml for a canonical registry.
+
+    Hard-links the session copy (one link(2) call) where possible. This is
+    safe because save_yaml() never writes in place: it replaces the target
+    by rename, leaving the shared inode untouched. Tests must not modify
+    these files with write_text() and friends.
+    """
+    file_path = tmp_path / "templates.yaml"
+    try:
+        os.link(canonical_dir / f"{name}.yaml", file_path)
+    except OSError:  # e.g. filesystems without hard links
+        shutil.copyfile(canonical_dir / f"{name}.yaml", file_path)
+    return file_path
+
+
+@pytest.fixture
+def empty_templates_file(_canonical_templates_dir, tmp_path) -> Path:
+    """Return a writable registry with one category and no templates."""
+    return _materialize_templates_file(_canonical_templates_dir, tmp_path, "empty")
+
+
+@pytest.fixture
+def single_template_file(_canonical_templates_dir, tmp_path) -> Path:
+    """Return a writable registry holding 'test-template' (tier and tags set)."""
+    return _materialize_templates_file(_canonical_templates_dir, tmp_path, "single")
+
+
+@pytest.fixture
+def two_template_file(_canonical_templates_dir, tmp_path) -> Path:
+    """Return a writable registry holding 'template-to-remove' and 'template-to-keep'."""
+    return _materialize_templates_file(_canonical_templates_dir, tmp_path, "two")
+
+
 @pytest.fixture
-def temp_schema_file(tmp_path, schema_yaml_path):
-    """Create a temporary copy of the schema file."""
-    schema_content = schema_yaml_path.read_text()
-    temp_schema = tmp_path / "templates.schema.yaml"
+def referenced_template_file(_canonical_templates_dir, tmp_path) -> Path:
+    """Return a writable registry where two templates relate to 'referenced-template'."""
+    return _materialize_templates_file(_canonical_templates_dir, tmp_path, "referenced")
+
+
+@pytest.fixture(scope="session")
+def shared_yaml_file(tmp_path_factory):
+    """Factory fixture for read-only YAML files shared across the session.
+
+    Files are named by a hash of their content and written once, so tests
+    passing identical content get the same path. Tests that modify the file
+    must use temp_yaml_file instead.
+    """
+    shared_dir = tmp_path_factory.mktemp("shared_yaml")
+
+    def _get_shared_yaml(content: str) -> Path:
+        digest = hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+        file_path = shared_dir / f"{digest}.yaml"
+        if not file_path.exists():
+            file_path.write_text(content)
+        return file_path
+    return _get_shared_yaml
+
+
+@pytest.fixture(scope="session")
+def temp_schema_file(tmp_path_factory):
+    """Create a temporary copy of the schema file, shared by the session.
+
+    Sharing one path lets get_schema_validator() compile the schema once for
+    the whole run. Tests that modify the schema must make their own copy.
+    """
+    schema_content = (Path(__file__).parent.parent / "templates.schema.yaml").read_text()
+    temp_schema = tmp_path_factory.mktemp("schema") / "templates.schema.yaml"
     temp_schema.write_text(schema_content)
     return temp_schema
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _prewarm_schema_validators(temp_schema_file, valid_templates_dict):
+    """Import and compile the shared schema validators before any test runs.
+
+    Keeps jsonschema/fastjsonschema import and compilation cost out of the
+    first schema test's timing (see --durations). Running the jsonschema
+    validator over a valid document also compiles the schema's "pattern"
+    regexes into re's module cache.
+    """
+    from scripts.template_manager import get_fast_schema_validator, get_schema_validator
+
+    get_schema_validator(temp_schema_file).is_valid(valid_templates_dict)
+    get_fast_schema_validator(temp_schema_file)
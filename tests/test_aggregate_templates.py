@@ -0,0 +1,463 @@
+"""Tests for build-time documentation aggregation."""
+
+import asyncio
+import hashlib
+import json
+import time
+
+import aiohttp
+import pytest
+
+import scripts.aggregate_templates as agg
+from scripts.aggregate_templates import (
+    MAX_RETRIES,
+    NOT_MODIFIED,
+    AsyncTokenBucket,
+    CacheManifest,
+    ContentTransformer,
+    GitHubFetcher,
+    aggregate_template,
+    _malformed_reason,
+    _resolve,
+)
+
+
+GOOD_TEMPLATE = {
+    "id": "good-template",
+    "repo": {"owner": "test-org", "name": "good-repo"},
+    "directories": {"docs": [{"path": "README.md", "target": "overview.md"}]},
+}
+
+
+class FakeResponse:
+    """Stand-in for aiohttp.ClientResponse with just what the fetcher reads."""
+
+    def __init__(self, status=200, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+
+class FakeBody:
+    """Stand-in for resp.content that yields fixed chunks."""
+
+    def __init__(self, *chunks):
+        self.chunks = chunks
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class FakeSession:
+    """Returns queued responses in order and records each request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+class FakeFetcher:
+    """Serves one fetch_file result for every doc and records the ETags sent."""
+
+    def __init__(self, result):
+        self.result = result
+        self.etags = []
+
+    async def fetch_file(self, owner, repo, sha, path, etag=None):
+        self.etags.append(etag)
+        return self.result
+
+
+OLD_SHA = "a" * 40
+NEW_SHA = "b" * 40
+CACHED_RECORD = {"name": "overview.md", "etag": '"old-etag"', "sha256": "0" * 64}
+
+
+def cached_template(tmp_path, write_output=True):
+    """A cache and output dir holding GOOD_TEMPLATE as rendered at OLD_SHA."""
+    template_output = tmp_path / "good-template"
+    template_output.mkdir()
+    if write_output:
+        (template_output / "overview.md").write_text("rendered at old sha")
+    cache = CacheManifest()
+    cache.update("good-template", OLD_SHA, [dict(CACHED_RECORD)])
+    return cache, template_output / "overview.md"
+
+
+def run_aggregation(tmp_path, monkeypatch, templates):
+    """Run main() against a temporary config with the network stubbed out."""
+    config = {
+        "settings": {
+            "cache": {"directory": str(tmp_path / "cache")},
+            "output": {"docs_directory": str(tmp_path / "docs")},
+        },
+        "templates": templates,
+    }
+    (tmp_path / "templates.yaml").write_text(json.dumps(config))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+
+    async def fake_shas(self, repos):
+        return {f"{owner}/{name}": "a" * 40 for owner, name in repos}
+
+    async def fake_fetch(self, owner, repo, sha, path, etag=None):
+        return f"# {repo}\n", '"etag"'
+
+    monkeypatch.setattr(GitHubFetcher, "get_commit_shas_bulk", fake_shas)
+    monkeypatch.setattr(GitHubFetcher, "fetch_file", fake_fetch)
+    asyncio.run(agg.main())
+    return json.loads((tmp_path / "cache" / "manifest.json").read_text())
+
+
+class TestMain:
+    """Test the aggregation entry point."""
+
+    @pytest.mark.parametrize(
+        "malformed",
+        [
+            {"id": "no-repo"},
+            {"id": "no-owner", "repo": {"name": "repo"}},
+            {"id": "no-name", "repo": {"owner": "test-org"}},
+            {"repo": {"owner": "test-org", "name": "no-id"}},
+            "not-a-mapping",
+        ],
+    )
+    def test_malformed_template_does_not_abort_run(
+        self, tmp_path, monkeypatch, malformed
+    ):
+        """A malformed entry is skipped and the good one is still aggregated."""
+        manifest = run_aggregation(tmp_path, monkeypatch, [malformed, GOOD_TEMPLATE])
+
+        assert list(manifest) == ["good-template"]
+        overview = tmp_path / "docs" / "good-template" / "overview.md"
+        assert "# good-repo" in overview.read_text()
+
+    def test_fully_cached_run_saves_manifest_once(self, tmp_path, monkeypatch):
+        """Cache hits change nothing, so only the final save runs."""
+        second = {**GOOD_TEMPLATE, "id": "second-template"}
+        run_aggregation(tmp_path, monkeypatch, [GOOD_TEMPLATE, second])
+
+        saves = []
+        original_save = agg.CacheManifest.save
+        monkeypatch.setattr(
+            agg.CacheManifest,
+            "save",
+            lambda self, path: saves.append(path) or original_save(self, path),
+        )
+        manifest = run_aggregation(tmp_path, monkeypatch, [GOOD_TEMPLATE, second])
+
+        assert sorted(manifest) == ["good-template", "second-template"]
+        assert len(saves) == 1
+
+
+class TestMalformedReason:
+    """Test the per-entry well-formedness check."""
+
+    def test_well_formed(self):
+        assert _malformed_reason(GOOD_TEMPLATE) is None
+
+    def test_empty_owner(self):
+        template = {**GOOD_TEMPLATE, "repo": {"owner": "", "name": "repo"}}
+        assert _malformed_reason(template) == "missing 'repo.owner'"
+
+
+class TestConditionalFetch:
+    """Test ETag-based conditional GETs."""
+
+    def test_fetch_file_sends_if_none_match(self):
+        """A cached ETag is sent as If-None-Match and a 304 is NOT_MODIFIED."""
+        session = FakeSession(FakeResponse(304))
+        fetcher = GitHubFetcher(token=None)
+        fetcher._session = session
+
+        result = asyncio.run(
+            fetcher.fetch_file("o", "r", NEW_SHA, "README.md", etag='"old-etag"')
+        )
+
+        assert result == (NOT_MODIFIED, '"old-etag"')
+        assert session.requests[0][2]["headers"] == {"If-None-Match": '"old-etag"'}
+
+    def test_not_modified_reuses_cached_record_without_writing(self, tmp_path):
+        """A 304 carries the cached record forward and leaves the output alone."""
+        cache, output_file = cached_template(tmp_path)
+        fetcher = FakeFetcher((NOT_MODIFIED, '"old-etag"'))
+
+        result = asyncio.run(
+            aggregate_template(GOOD_TEMPLATE, fetcher, cache, tmp_path, NEW_SHA)
+        )
+
+        assert result == ("good-template", NEW_SHA, True)
+        assert fetcher.etags == ['"old-etag"']
+        assert output_file.read_text() == "rendered at old sha"
+        assert cache.entries["good-template"]["files"] == [CACHED_RECORD]
+
+    def test_missing_output_disables_etag(self, tmp_path):
+        """Without the previous output on disk the fetch is unconditional."""
+        cache, output_file = cached_template(tmp_path, write_output=False)
+        fetcher = FakeFetcher(("# fresh\n", '"new-etag"'))
+
+        asyncio.run(aggregate_template(GOOD_TEMPLATE, fetcher, cache, tmp_path, NEW_SHA))
+
+        assert fetcher.etags == [None]
+        assert "# fresh" in output_file.read_text()
+
+
+class TestUnchangedSource:
+    """Test skipping the transform when the fetched source is unchanged."""
+
+    def test_same_source_skips_write_and_carries_record_forward(self, tmp_path):
+        """Identical source bytes keep the output and update only the ETag."""
+        source = "# same\n"
+        cache, output_file = cached_template(tmp_path)
+        record = {
+            **CACHED_RECORD,
+            "sha256": hashlib.sha256(source.encode()).hexdigest(),
+            "commit_sha": OLD_SHA,
+        }
+        cache.update("good-template", OLD_SHA, [record])
+        fetcher = FakeFetcher((source, '"new-etag"'))
+
+        asyncio.run(aggregate_template(GOOD_TEMPLATE, fetcher, cache, tmp_path, NEW_SHA))
+
+        assert output_file.read_text() == "rendered at old sha"
+        entry = cache.entries["good-template"]
+        assert entry["commit_sha"] == NEW_SHA
+        assert entry["files"] == [{**record, "etag": '"new-etag"'}]
+
+    def test_changed_source_records_render_commit(self, tmp_path):
+        """A rewritten doc records the commit it was rendered from."""
+        cache, output_file = cached_template(tmp_path)
+        fetcher = FakeFetcher(("# changed\n", '"new-etag"'))
+
+        asyncio.run(aggregate_template(GOOD_TEMPLATE, fetcher, cache, tmp_path, NEW_SHA))
+
+        assert f"Commit: `{NEW_SHA[:7]}`" in output_file.read_text()
+        (record,) = cache.entries["good-template"]["files"]
+        assert record["commit_sha"] == NEW_SHA
+        assert record["etag"] == '"new-etag"'
+
+
+class TestReadBody:
+    """Test reading a response body into a pre-sized buffer."""
+
+    @pytest.mark.parametrize(
+        "content_length",
+        [
+            "4",  # compressed on the wire: body decodes larger
+            "64",  # body shorter than the advertised length
+            None,  # no Content-Length
+        ],
+    )
+    def test_read_body_returns_exact_bytes(self, content_length):
+        resp = FakeResponse(
+            headers={"Content-Length": content_length} if content_length else {}
+        )
+        resp.content = FakeBody(b"hello ", b"chunked ", b"world")
+
+        body = asyncio.run(GitHubFetcher._read_body(resp))
+
+        assert body == b"hello chunked world"
+
+
+class TestGetCommitShasBulk:
+    """Test HEAD SHA resolution and its REST fallback."""
+
+    @staticmethod
+    def fake_rest(shas):
+        async def get_commit_sha(self, owner, repo):
+            return shas.get(f"{owner}/{repo}")
+
+        return get_commit_sha
+
+    def test_without_token_uses_rest(self, monkeypatch):
+        """GraphQL needs auth, so unauthenticated runs go straight to REST."""
+        monkeypatch.setattr(
+            GitHubFetcher, "get_commit_sha", self.fake_rest({"o/a": "sha-a"})
+        )
+        fetcher = GitHubFetcher(token=None)
+
+        shas = asyncio.run(
+            fetcher.get_commit_shas_bulk([("o", "a"), ("o", "b"), ("o", "a")])
+        )
+
+        assert shas == {"o/a": "sha-a"}
+
+    def test_graphql_failure_falls_back_to_rest(self, monkeypatch):
+        """A failed GraphQL request resolves every repo through REST."""
+
+        async def failing_request(self, method, url, paced=True, **kwargs):
+            raise aiohttp.ClientError("boom")
+
+        monkeypatch.setattr(GitHubFetcher, "_request", failing_request)
+        monkeypatch.setattr(
+            GitHubFetcher,
+            "get_commit_sha",
+            self.fake_rest({"o/a": "sha-a", "o/b": "sha-b"}),
+        )
+        fetcher = GitHubFetcher(token="token")
+
+        shas = asyncio.run(fetcher.get_commit_shas_bulk([("o", "a"), ("o", "b")]))
+
+        assert shas == {"o/a": "sha-a", "o/b": "sha-b"}
+
+    def test_no_repos(self):
+        assert asyncio.run(GitHubFetcher(token=None).get_commit_shas_bulk([])) == {}
+
+
+class TestRequestRetries:
+    """Test GitHubFetcher._request retry and backoff."""
+
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        """Record asyncio.sleep delays instead of waiting."""
+        delays = []
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr(agg.asyncio, "sleep", fake_sleep)
+        return delays
+
+    @staticmethod
+    def make_fetcher(session, monkeypatch):
+        fetcher = GitHubFetcher(token="token")
+        fetcher._session = session
+        pauses = []
+        monkeypatch.setattr(fetcher._bucket, "pause", pauses.append)
+        return fetcher, pauses
+
+    def test_rate_limit_retry_after_pauses_bucket(self, monkeypatch, sleeps):
+        """A 429 with Retry-After holds back the bucket, then the retry succeeds."""
+        limited = FakeResponse(429, {"Retry-After": "7"})
+        ok = FakeResponse(200)
+        fetcher, pauses = self.make_fetcher(FakeSession(limited, ok), monkeypatch)
+
+        resp = asyncio.run(fetcher._request("GET", "https://api.github.com/x"))
+
+        assert resp is ok
+        assert limited.released
+        assert pauses == [7]
+        assert sleeps == []
+
+    def test_server_errors_back_off_locally_until_max_retries(
+        self, monkeypatch, sleeps
+    ):
+        """5xx responses back off per request and the last one is returned."""
+        responses = [FakeResponse(502) for _ in range(MAX_RETRIES + 1)]
+        session = FakeSession(*responses)
+        fetcher, pauses = self.make_fetcher(session, monkeypatch)
+
+        resp = asyncio.run(fetcher._request("GET", "https://api.github.com/x"))
+
+        assert resp is responses[-1]
+        assert not resp.released
+        assert len(session.requests) == MAX_RETRIES + 1
+        assert sleeps == [2 ** attempt for attempt in range(MAX_RETRIES)]
+        assert pauses == []
+
+    def test_malformed_rate_limit_reset_is_ignored(self, monkeypatch, sleeps):
+        """A non-numeric X-RateLimit-Reset does not raise."""
+        ok = FakeResponse(
+            200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "soon"}
+        )
+        fetcher, pauses = self.make_fetcher(FakeSession(ok), monkeypatch)
+
+        assert asyncio.run(fetcher._request("GET", "https://api.github.com/x")) is ok
+        assert pauses == []
+
+
+RAW = f"https://raw.githubusercontent.com/test-org/test-repo/{NEW_SHA}"
+BLOB = f"https://github.com/test-org/test-repo/blob/{NEW_SHA}"
+
+
+class TestContentTransformer:
+    """Test image and link rewriting."""
+
+    @pytest.mark.parametrize(
+        "markdown,expected",
+        [
+            ("![logo](img/logo.png)", f"![logo]({RAW}/docs/img/logo.png)"),
+            ("[Setup](setup.md)", f"[Setup]({BLOB}/docs/setup.md)"),
+            ("[Up](../README.md)", f"[Up]({BLOB}/README.md)"),
+            ("[Top](#top)", "[Top](#top)"),
+            ("[Mail](mailto:a@example.com)", "[Mail](mailto:a@example.com)"),
+            ("[Site](https://example.com/a.md)", "[Site](https://example.com/a.md)"),
+            ("![CDN](https://example.com/a.png)", "![CDN](https://example.com/a.png)"),
+            ("[Data](data.json)", "[Data](data.json)"),
+            ("[](empty.md)", "[](empty.md)"),
+            # The badge image inside a link is rewritten as an image
+            (
+                "[![CI](badge.svg)](../README.md)",
+                f"[![CI]({RAW}/docs/badge.svg)](../README.md)",
+            ),
+        ],
+    )
+    def test_transform_rewrites_refs(self, markdown, expected):
+        transformer = ContentTransformer(
+            "test-org", "test-repo", NEW_SHA, "docs/guide.md", synced_on="2026-01-03"
+        )
+
+        result = transformer.transform(markdown)
+
+        assert result.endswith("\n\n" + expected)
+        assert result.startswith('!!! info "Source Repository"')
+        assert f"Last synced: 2026-01-03 | Commit: `{NEW_SHA[:7]}`" in result
+
+
+class TestResolve:
+    """Test relative path resolution."""
+
+    @pytest.mark.parametrize(
+        "base,relative,expected",
+        [
+            ("docs", "img.png", "docs/img.png"),
+            ("docs", "./img.png", "docs/img.png"),
+            ("docs/guide", "../img.png", "docs/img.png"),
+            ("docs", "../../img.png", "img.png"),
+            ("", "img.png", "img.png"),
+            ("docs", "/assets/img.png", "assets/img.png"),
+            ("docs", "a//b/./c.md", "docs/a/b/c.md"),
+        ],
+    )
+    def test_resolve(self, base, relative, expected):
+        assert _resolve(base, relative) == expected
+
+
+class TestAsyncTokenBucket:
+    """Test request pacing."""
+
+    @staticmethod
+    def timed_acquires(bucket, count):
+        async def acquire_all():
+            start = time.monotonic()
+            for _ in range(count):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        return asyncio.run(acquire_all())
+
+    def test_burst_up_to_capacity_does_not_wait(self):
+        assert self.timed_acquires(AsyncTokenBucket(rate=1, capacity=3), 3) < 0.5
+
+    def test_waits_for_token_once_capacity_is_spent(self):
+        elapsed = self.timed_acquires(AsyncTokenBucket(rate=20, capacity=1), 3)
+        assert elapsed >= 0.09
+
+    def test_pause_holds_back_acquirers(self):
+        bucket = AsyncTokenBucket(rate=1, capacity=3)
+        bucket.pause(0.1)
+        assert self.timed_acquires(bucket, 1) >= 0.09
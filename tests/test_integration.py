@@ -13,7 +13,7 @@ import pytest
 class TestCRUDIntegration:
     """Test complete CRUD workflows."""
 
-    def test_add_list_update_remove_roundtrip(self, project_root, tmp_path):
+    def test_add_list_update_remove_roundtrip(self, tmp_path):
         """Complete CRUD cycle should work correctly."""
         from scripts.template_manager import (
             add_template,
@@ -74,12 +74,11 @@ templates: []
         data = load_yaml(test_templates)
         assert len(data["templates"]) == 0
 
-    def test_add_then_validate_passes(self, project_root, tmp_path):
+    def test_add_then_validate_passes(self, schema_yaml_path, tmp_path):
         """After adding a template, validation should pass."""
         from scripts.template_manager import add_template, validate
 
         test_templates = tmp_path / "templates.yaml"
-        test_schema = project_root / "templates.schema.yaml"
 
         test_templates.write_text('''version: "1.0"
 
@@ -102,10 +101,10 @@ templates: []
         )
 
         # Validate should pass
-        result = validate(test_templates, test_schema)
+        result = validate(test_templates, schema_yaml_path)
         assert result.success is True, f"Validation should pass: {result.schema_errors} {result.semantic_errors}"
 
-    def test_multiple_operations_preserve_formatting(self, project_root, tmp_path):
+    def test_multiple_operations_preserve_formatting(self, tmp_path):
         """Multiple operations should preserve YAML formatting."""
         from scripts.template_manager import add_template, update_template, remove_template
 
@@ -162,8 +161,13 @@ templates: []
         assert "# Categories" in final_content
         assert "# Templates section" in final_content
 
-    def test_cli_add_list_validates_workflow(self, project_root, tmp_path):
-        """CLI commands should work in sequence."""
+    def test_cli_add_list_validates_workflow(self, schema_yaml_path, tmp_path, capsys):
+        """CLI commands should work in sequence (run in-process via main())."""
+        from scripts import template_manager
+
+        def run_cli(*args: str) -> int:
+            return template_manager.main(list(args))
+
         test_templates = tmp_path / "templates.yaml"
         test_templates.write_text('''version: "1.0"
 categories:
@@ -172,44 +176,41 @@ categories:
 templates: []
 ''')
 
-        script_path = project_root / "scripts" / "template_manager.py"
-
         # Add via CLI
-        add_result = subprocess.run(
-            [
-                sys.executable, str(script_path), "add",
-                "--id", "cli-test",
-                "--repo", "test-org/test-repo",
-                "--title", "CLI Test",
-                "--description", "Testing CLI",
-                "--category", "test-category",
-                "--templates", str(test_templates),
-            ],
-            capture_output=True,
-            text=True,
+        returncode = run_cli(
+            "add",
+            "--id", "cli-test",
+            "--repo", "test-org/test-repo",
+            "--title", "CLI Test",
+            "--description", "Testing CLI",
+            "--category", "test-category",
+            "--templates", str(test_templates),
         )
-        assert add_result.returncode == 0, f"CLI add should succeed: {add_result.stderr}"
+        assert returncode == 0, f"CLI add should succeed: {capsys.readouterr().err}"
+        capsys.readouterr()
 
         # List via CLI
-        list_result = subprocess.run(
-            [
-                sys.executable, str(script_path), "list",
-                "--templates", str(test_templates),
-            ],
-            capture_output=True,
-            text=True,
-        )
-        assert list_result.returncode == 0
-        assert "cli-test" in list_result.stdout.lower()
+        returncode = run_cli("list", "--templates", str(test_templates))
+        assert returncode == 0
+        assert "cli-test" in capsys.readouterr().out.lower()
 
         # Validate via CLI
-        validate_result = subprocess.run(
-            [
-                sys.executable, str(script_path), "validate",
-                "--templates", str(test_templates),
-                "--schema", str(project_root / "templates.schema.yaml"),
-            ],
+        returncode = run_cli(
+            "validate",
+            "--templates", str(test_templates),
+            "--schema", str(schema_yaml_path),
+        )
+        assert returncode == 0, f"Validation should pass: {capsys.readouterr().err}"
+
+
+class TestScriptEntryPoint:
+    """Smoke test the CLI as a real process."""
+
+    def test_script_validate_runs(self, project_root):
+        """Running the script directly should validate the project registry."""
+        result = subprocess.run(
+            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "validate"],
             capture_output=True,
             text=True,
         )
-        assert validate_result.returncode == 0, f"Validation should pass: {validate_result.stderr}"
+        assert result.returncode == 0, result.stderr
@@ -3,122 +3,107 @@
 These tests define the expected CLI behavior for the template manager.
 """
 
+import contextlib
+import io
 import json
-import subprocess
-import sys
 from pathlib import Path
 
 import pytest
 
+from scripts.template_manager import build_parser, main
+
+
+def run_cli(capsys, *args: str) -> tuple[int, str, str]:
+    """Run the CLI in-process and return (exit code, stdout, stderr)."""
+    try:
+        returncode = main(list(args))
+    except SystemExit as e:
+        returncode = e.code if isinstance(e.code, int) else 1
+    captured = capsys.readouterr()
+    return returncode, captured.out, captured.err
+
+
+def capture_cli(*args: str) -> tuple[int, str, str]:
+    """Like run_cli, for module-scoped fixtures where capsys is unavailable."""
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            returncode = main(list(args))
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+    return returncode, out.getvalue(), err.getvalue()
+
+
+@pytest.fixture(scope="module")
+def cli_help_text() -> str:
+    """Return the top-level help text without running the CLI."""
+    return build_parser().format_help()
+
+
+@pytest.fixture(scope="module")
+def list_json_output() -> tuple[int, str, str]:
+    """Run 'list --format json' against the project registry once per module."""
+    return capture_cli("list", "--format", "json")
+
 
 class TestCLIStructure:
     """Test CLI structure and subcommands."""
 
-    def test_cli_has_validate_subcommand(self, project_root):
-        """CLI should have a validate subcommand."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "validate", "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0, f"validate subcommand should exist: {result.stderr}"
-        assert "validate" in result.stdout.lower()
-
-    def test_cli_has_list_subcommand(self, project_root):
-        """CLI should have a list subcommand."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "list", "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0, f"list subcommand should exist: {result.stderr}"
-        assert "list" in result.stdout.lower()
-
-    def test_cli_help_shows_available_commands(self, project_root):
-        """CLI help should show available subcommands."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0
-        assert "validate" in result.stdout.lower()
-        assert "list" in result.stdout.lower()
+    @pytest.mark.parametrize("command", ["validate", "list"])
+    def test_cli_has_subcommand(self, subcommand_parsers, command):
+        """CLI should have validate and list subcommands."""
+        assert command in subcommand_parsers, f"{command} subcommand should exist"
+        assert command in subcommand_parsers[command].format_help().lower()
+
+    @pytest.mark.parametrize("needle", ["validate", "list", "usage"])
+    def test_cli_help_shows_available_commands(self, cli_help_text, needle):
+        """CLI help should show usage and available subcommands."""
+        assert needle in cli_help_text.lower()
 
-    def test_cli_invalid_command_shows_error(self, project_root):
+    def test_cli_invalid_command_shows_error(self, capsys):
         """CLI should show error for invalid subcommand."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "invalid-command"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode != 0
+        returncode, stdout, stderr = run_cli(capsys, "invalid-command")
+        assert returncode != 0
 
-    def test_cli_no_command_shows_help(self, project_root):
+    def test_cli_no_command_shows_help(self, capsys):
         """CLI with no command should show help or error."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py")],
-            capture_output=True,
-            text=True,
-        )
+        returncode, stdout, stderr = run_cli(capsys)
         # Should either show help (return 0) or error (return non-0)
         # Either way, help info should be present
-        combined_output = result.stdout + result.stderr
+        combined_output = stdout + stderr
         assert "validate" in combined_output.lower() or "usage" in combined_output.lower()
 
 
 class TestValidateCommand:
     """Test the validate subcommand."""
 
-    def test_validate_command_succeeds_on_valid_templates(self, project_root):
+    def test_validate_command_succeeds_on_valid_templates(self, capsys):
         """validate command should succeed on valid templates.yaml."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "validate"],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0, f"validate should succeed: {result.stderr}"
+        returncode, stdout, stderr = run_cli(capsys, "validate")
+        assert returncode == 0, f"validate should succeed: {stderr}"
 
-    def test_validate_command_fails_on_invalid_file(self, project_root, tmp_path):
+    def test_validate_command_fails_on_invalid_file(self, tmp_path, capsys):
         """validate command should fail on invalid file."""
         invalid_yaml = tmp_path / "invalid.yaml"
         invalid_yaml.write_text("invalid: yaml: content")
 
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "validate",
-                "--templates",
-                str(invalid_yaml),
-            ],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode != 0
+        returncode, stdout, stderr = run_cli(capsys, "validate", "--templates", str(invalid_yaml))
+        assert returncode != 0
 
-    def test_validate_command_accepts_custom_paths(self, project_root, tmp_path, valid_templates_yaml):
+    def test_validate_command_accepts_custom_paths(self, schema_yaml_path, tmp_path, valid_templates_yaml, capsys):
         """validate command should accept custom template and schema paths."""
         templates_file = tmp_path / "templates.yaml"
         templates_file.write_text(valid_templates_yaml)
 
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "validate",
-                "--templates",
-                str(templates_file),
-                "--schema",
-                str(project_root / "templates.schema.yaml"),
-            ],
-            capture_output=True,
-            text=True,
+        returncode, stdout, stderr = run_cli(
+            capsys,
+            "validate",
+            "--templates", str(templates_file),
+            "--schema", str(schema_yaml_path),
         )
-        assert result.returncode == 0, f"validate should succeed with custom paths: {result.stderr}"
+        assert returncode == 0, f"validate should succeed with custom paths: {stderr}"
 
-    def test_validate_command_outputs_errors_clearly(self, project_root, tmp_path):
+    def test_validate_command_outputs_errors_clearly(self, schema_yaml_path, tmp_path, capsys):
         """validate command should output errors in a clear format."""
         invalid_yaml = tmp_path / "templates.yaml"
         invalid_yaml.write_text('''version: "1.0"
@@ -126,133 +111,66 @@ templates:
   - id: test
     # Missing required fields
 ''')
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "validate",
-                "--templates",
-                str(invalid_yaml),
-                "--schema",
-                str(project_root / "templates.schema.yaml"),
-            ],
-            capture_output=True,
-            text=True,
+        returncode, stdout, stderr = run_cli(
+            capsys,
+            "validate",
+            "--templates", str(invalid_yaml),
+            "--schema", str(schema_yaml_path),
         )
-        assert result.returncode != 0
+        assert returncode != 0
         # Output should contain error information
-        combined = result.stdout + result.stderr
+        combined = stdout + stderr
         assert "error" in combined.lower() or "failed" in combined.lower()
 
 
 class TestListCommand:
     """Test the list subcommand."""
 
-    def test_list_command_outputs_templates(self, project_root):
+    def test_list_command_outputs_templates(self, capsys):
         """list command should output template information."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "list"],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0, f"list should succeed: {result.stderr}"
+        returncode, stdout, stderr = run_cli(capsys, "list")
+        assert returncode == 0, f"list should succeed: {stderr}"
         # Should contain at least one known template
-        assert "litellm" in result.stdout.lower() or "langfuse" in result.stdout.lower()
+        assert "litellm" in stdout.lower() or "langfuse" in stdout.lower()
 
-    def test_list_command_json_format_is_valid_json(self, project_root):
+    def test_list_command_json_format_is_valid_json(self, list_json_output):
         """list --format json should output valid JSON."""
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "list",
-                "--format",
-                "json",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0, f"list --format json should succeed: {result.stderr}"
+        returncode, stdout, stderr = list_json_output
+        assert returncode == 0, f"list --format json should succeed: {stderr}"
         # Should be valid JSON
         try:
-            data = json.loads(result.stdout)
+            data = json.loads(stdout)
         except json.JSONDecodeError as e:
-            pytest.fail(f"Output should be valid JSON: {e}\nOutput: {result.stdout}")
+            pytest.fail(f"Output should be valid JSON: {e}\nOutput: {stdout}")
         assert isinstance(data, list), "JSON output should be a list of templates"
         assert len(data) > 0, "Should have at least one template"
 
-    def test_list_command_filter_by_category(self, project_root):
+    def test_list_command_filter_by_category(self, capsys):
         """list --category should filter templates by category."""
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "list",
-                "--category",
-                "observability",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0
+        returncode, stdout, stderr = run_cli(capsys, "list", "--category", "observability")
+        assert returncode == 0
         # Should contain observability templates
-        assert "litellm" in result.stdout.lower()
+        assert "litellm" in stdout.lower()
 
-    def test_list_command_filter_by_tier(self, project_root):
+    def test_list_command_filter_by_tier(self, capsys):
         """list --tier should filter templates by tier."""
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "list",
-                "--tier",
-                "starter",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0
+        returncode, stdout, stderr = run_cli(capsys, "list", "--tier", "starter")
+        assert returncode == 0
         # Should contain starter tier templates
-        assert "starter" in result.stdout.lower()
+        assert "starter" in stdout.lower()
 
-    def test_list_command_nonexistent_category_shows_empty_or_message(self, project_root):
+    def test_list_command_nonexistent_category_shows_empty_or_message(self, capsys):
         """list --category with nonexistent category should handle gracefully."""
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "list",
-                "--category",
-                "nonexistent-category-xyz",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
+        returncode, stdout, stderr = run_cli(capsys, "list", "--category", "nonexistent-category-xyz")
         # Should either succeed with empty result or show appropriate message
         # Not fail catastrophically
-        assert result.returncode == 0
+        assert returncode == 0
 
-    def test_list_json_contains_expected_fields(self, project_root):
+    def test_list_json_contains_expected_fields(self, list_json_output):
         """JSON output should contain expected template fields."""
-        result = subprocess.run(
-            [
-                sys.executable,
-                str(project_root / "scripts" / "template_manager.py"),
-                "list",
-                "--format",
-                "json",
-            ],
-            capture_output=True,
-            text=True,
-            cwd=str(project_root),
-        )
-        assert result.returncode == 0
-        data = json.loads(result.stdout)
+        returncode, stdout, stderr = list_json_output
+        assert returncode == 0
+        data = json.loads(stdout)
         assert len(data) > 0
 
         # Check first template has expected fields
@@ -260,3 +178,25 @@ class TestListCommand:
         expected_fields = ["id", "title", "description", "category", "tier"]
         for field in expected_fields:
             assert field in template, f"Template should have '{field}' field"
+
+    def test_list_json_escapes_non_ascii(self, tmp_path, capsys):
+        """JSON output should be ASCII-only, matching json.dumps(indent=2)."""
+        templates_file = tmp_path / "templates.yaml"
+        templates_file.write_text('''version: "1.0"
+categories:
+  - id: test-category
+    name: "Test Category"
+templates:
+  - id: cafe-template
+    title: "Caf\u00e9 \u2713"
+    category: test-category
+''', encoding="utf-8")
+
+        returncode, stdout, stderr = run_cli(
+            capsys, "list", "--format", "json", "--templates", str(templates_file)
+        )
+
+        assert returncode == 0, stderr
+        assert stdout.isascii()
+        assert '"title": "Caf\\u00e9 \\u2713"' in stdout
+        assert stdout == json.dumps(json.loads(stdout), indent=2) + "\n"
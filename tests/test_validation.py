@@ -3,145 +3,234 @@
 These tests define the expected behavior for Level 1 (Schema) and Level 2 (Semantic) validation.
 """
 
+import os
+from pathlib import Path
+
 import pytest
 
+import scripts.template_manager as tm
+from scripts.template_manager import (
+    _load_schema,
+    _to_plain,
+    compile_schema,
+    get_schema_validator,
+    load_yaml,
+    validate,
+    validate_schema,
+    validate_semantic,
+    validate_semantic_data,
+)
+
+
+INVALID_TEMPLATE_IDS_YAML = '''version: "1.0"
+categories:
+  - id: test-category
+    name: "Test Category"
 
-class TestLevel1SchemaValidation:
-    """Test JSON Schema validation (Level 1)."""
+templates:
+  - id: "Bad_ID"
+    category: test-category
+  - id: "ok-id\\n"
+    category: test-category
+'''
 
-    def test_validate_schema_valid_templates_returns_no_errors(
-        self, temp_yaml_file, temp_schema_file, valid_templates_yaml
-    ):
-        """Valid templates.yaml should pass schema validation."""
-        from scripts.template_manager import validate_schema
+INVALID_RELATES_TO_YAML = '''version: "1.0"
+categories:
+  - id: test-category
+    name: "Test Category"
 
-        templates_path = temp_yaml_file(valid_templates_yaml)
-        errors = validate_schema(templates_path, temp_schema_file)
-        assert errors == [], f"Expected no errors, got: {errors}"
+templates:
+  - id: test-template
+    repo:
+      owner: "test-org"
+      name: "test-repo"
+    title: "Test Template"
+    description: "Template with invalid relates_to"
+    category: test-category
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+    relates_to:
+      - template_id: nonexistent-template
+        relationship: production_version
+'''
 
-    def test_validate_schema_missing_required_field_returns_error(
-        self, temp_yaml_file, temp_schema_file, invalid_missing_required_field_yaml
-    ):
-        """Missing required fields should return validation errors."""
-        from scripts.template_manager import validate_schema
+# Schema-valid registry whose template references an unknown category
+UNKNOWN_CATEGORY_YAML = '''version: "1.0"
+categories:
+  - id: existing-category
+    name: "Existing"
 
-        templates_path = temp_yaml_file(invalid_missing_required_field_yaml)
-        errors = validate_schema(templates_path, temp_schema_file)
-        assert len(errors) > 0, "Expected validation errors for missing required fields"
-        # Should mention the missing field
-        error_text = str(errors)
-        assert any(
-            field in error_text.lower()
-            for field in ["title", "description", "category", "directories"]
-        ), f"Error should mention missing field, got: {errors}"
+templates:
+  - id: template-1
+    repo:
+      owner: "test"
+      name: "test"
+    title: "Template 1"
+    description: "Test"
+    category: nonexistent-category  # semantic error
+    directories:
+      docs:
+        - path: "README.md"
+          target: "overview.md"
+'''
 
-    def test_validate_schema_invalid_template_id_pattern_returns_error(
-        self, temp_yaml_file, temp_schema_file, invalid_id_pattern_yaml
-    ):
-        """Template IDs not matching pattern should return validation errors."""
-        from scripts.template_manager import validate_schema
+LIST_ROOT_YAML = '''- item1
+- item2
+- item3
+'''
 
-        templates_path = temp_yaml_file(invalid_id_pattern_yaml)
-        errors = validate_schema(templates_path, temp_schema_file)
-        assert len(errors) > 0, "Expected validation errors for invalid ID pattern"
+EXPLICIT_NULLS_YAML = '''version: "1.0"
+categories: null
+templates: null
+'''
 
-    def test_validate_schema_invalid_type_returns_error(
-        self, temp_yaml_file, temp_schema_file
-    ):
-        """Invalid types should return validation errors."""
-        from scripts.template_manager import validate_schema
+MISSING_CATEGORY_ID_YAML = '''version: "1.0"
+categories:
+  - name: "Missing ID Category"
 
-        invalid_yaml = '''version: "1.0"
 templates:
-  - id: "test"
+  - id: test-template
     repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: 123  # Should be string
+      owner: "test"
+      name: "test"
+    title: "Test"
     description: "Test"
-    category: "test"
+    category: test-category
     directories:
       docs:
         - path: "README.md"
           target: "overview.md"
 '''
-        templates_path = temp_yaml_file(invalid_yaml)
+
+
+class TestLevel1SchemaValidation:
+    """Test JSON Schema validation (Level 1)."""
+
+    def test_validate_schema_valid_templates_returns_no_errors(
+        self, shared_yaml_file, temp_schema_file, valid_templates_yaml
+    ):
+        """Valid templates.yaml should pass schema validation."""
+        templates_path = shared_yaml_file(valid_templates_yaml)
         errors = validate_schema(templates_path, temp_schema_file)
-        assert len(errors) > 0, "Expected validation errors for invalid type"
+        assert errors == [], f"Expected no errors, got: {errors}"
+
+    @pytest.mark.parametrize(
+        "yaml_fixture, expected_substrs",
+        [
+            pytest.param(
+                "invalid_missing_required_field_yaml",
+                ["title", "description", "category", "directories"],
+                id="missing-required-field",
+            ),
+            pytest.param("invalid_id_pattern_yaml", ["does not match"], id="invalid-id-pattern"),
+            pytest.param("invalid_type_yaml", ["is not of type"], id="invalid-type"),
+        ],
+    )
+    def test_validate_schema_invalid_templates_return_errors(
+        self, request, shared_yaml_file, temp_schema_file, yaml_fixture, expected_substrs
+    ):
+        """Schema violations should return errors describing the problem."""
+        templates_path = shared_yaml_file(request.getfixturevalue(yaml_fixture))
+        errors = validate_schema(templates_path, temp_schema_file)
+        assert len(errors) > 0, f"Expected validation errors for {yaml_fixture}"
+        error_text = str(errors).lower()
+        assert any(
+            substr in error_text for substr in expected_substrs
+        ), f"Error should mention one of {expected_substrs}, got: {errors}"
+
+    def test_schema_validator_is_reused_until_schema_changes(self, tmp_path, schema_yaml_path):
+        """Compiled schema validator should be cached per schema file version."""
+        temp_schema_file = tmp_path / "templates.schema.yaml"
+        temp_schema_file.write_text(schema_yaml_path.read_text())
+
+        first = get_schema_validator(temp_schema_file)
+        assert get_schema_validator(temp_schema_file) is first
+
+        # Touching the schema (new mtime) must invalidate the cached validator
+        st = temp_schema_file.stat()
+        os.utime(temp_schema_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert get_schema_validator(temp_schema_file) is not first
+
+    def test_validate_schema_invalid_schema_returns_error(self, temp_yaml_file, valid_templates_yaml):
+        """An invalid schema document should return an error, not crash."""
+        templates_path = temp_yaml_file(valid_templates_yaml)
+        schema_path = temp_yaml_file("type: 123\n", filename="bad.schema.yaml")
+        errors = validate_schema(templates_path, schema_path)
+        assert len(errors) == 1
+        assert "schema" in errors[0].lower()
+
+    def test_compiled_schema_json_is_used_only_when_fresh(self, tmp_path, schema_yaml_path):
+        """_load_schema should prefer a newer .json sibling and ignore a stale one."""
+        temp_schema_file = tmp_path / "templates.schema.yaml"
+        temp_schema_file.write_text(schema_yaml_path.read_text())
+
+        expected = _to_plain(load_yaml(temp_schema_file))
+        json_path = compile_schema(temp_schema_file)
+        assert json_path == temp_schema_file.with_suffix(".json")
+
+        # Mark the compiled file so we can tell which source was loaded
+        json_path.write_text('{"title": "compiled"}')
+        st = temp_schema_file.stat()
+        os.utime(json_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert _load_schema(temp_schema_file) == {"title": "compiled"}
+
+        # A YAML source newer than the JSON sibling wins
+        os.utime(temp_schema_file, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+        assert _load_schema(temp_schema_file) == expected
 
 
 class TestLevel2SemanticValidation:
     """Test semantic validation (Level 2)."""
 
-    def test_validate_semantic_duplicate_ids_returns_error(
-        self, temp_yaml_file, invalid_duplicate_ids_yaml
-    ):
+    def test_validate_semantic_duplicate_ids_returns_error(self, invalid_duplicate_ids_dict):
         """Duplicate template IDs should return validation errors."""
-        from scripts.template_manager import validate_semantic
-
-        templates_path = temp_yaml_file(invalid_duplicate_ids_yaml)
-        errors = validate_semantic(templates_path)
+        errors = validate_semantic_data(invalid_duplicate_ids_dict)
         assert len(errors) > 0, "Expected validation errors for duplicate IDs"
         assert "duplicate" in str(errors).lower(), f"Error should mention duplicate, got: {errors}"
 
+    def test_validate_semantic_duplicate_null_ids_returns_error(self):
+        """Two templates with id: null should still be reported as duplicates."""
+        data = {
+            "categories": [{"id": "test-category", "name": "Test Category"}],
+            "templates": [
+                {"id": None, "category": "test-category"},
+                {"id": None, "category": "test-category"},
+            ],
+        }
+        errors = validate_semantic_data(data)
+        assert "Duplicate template ID: 'None'" in errors
+
     def test_validate_semantic_invalid_category_reference_returns_error(
-        self, temp_yaml_file, invalid_category_reference_yaml
+        self, invalid_category_reference_dict
     ):
         """Invalid category references should return validation errors."""
-        from scripts.template_manager import validate_semantic
-
-        templates_path = temp_yaml_file(invalid_category_reference_yaml)
-        errors = validate_semantic(templates_path)
+        errors = validate_semantic_data(invalid_category_reference_dict)
         assert len(errors) > 0, "Expected validation errors for invalid category reference"
         assert "category" in str(errors).lower(), f"Error should mention category, got: {errors}"
 
-    def test_validate_semantic_http_url_returns_warning(
-        self, temp_yaml_file, http_url_yaml
-    ):
+    def test_validate_semantic_http_url_returns_warning(self, http_url_dict):
         """HTTP (not HTTPS) URLs should return warnings."""
-        from scripts.template_manager import validate_semantic
-
-        templates_path = temp_yaml_file(http_url_yaml)
-        errors, warnings = validate_semantic(templates_path, return_warnings=True)
+        errors, warnings = validate_semantic_data(http_url_dict, return_warnings=True)
         assert len(warnings) > 0, "Expected warnings for HTTP URL"
         assert "http" in str(warnings).lower(), f"Warning should mention HTTP, got: {warnings}"
 
-    def test_validate_semantic_valid_templates_returns_no_errors(
-        self, temp_yaml_file, valid_templates_yaml
-    ):
+    def test_validate_semantic_valid_templates_returns_no_errors(self, valid_templates_dict):
         """Valid templates should pass semantic validation."""
-        from scripts.template_manager import validate_semantic
+        errors = validate_semantic_data(valid_templates_dict)
+        assert errors == [], f"Expected no errors, got: {errors}"
 
-        templates_path = temp_yaml_file(valid_templates_yaml)
+    def test_validate_semantic_invalid_template_id_returns_error(self, shared_yaml_file):
+        """Malformed template IDs (including a trailing newline) should be errors."""
+        templates_path = shared_yaml_file(INVALID_TEMPLATE_IDS_YAML)
         errors = validate_semantic(templates_path)
-        assert errors == [], f"Expected no errors, got: {errors}"
+        assert len(errors) == 2, f"Expected two invalid ID errors, got: {errors}"
+        assert all("Invalid template ID" in e for e in errors)
 
-    def test_validate_semantic_invalid_relates_to_reference(self, temp_yaml_file):
+    def test_validate_semantic_invalid_relates_to_reference(self, shared_yaml_file):
         """relates_to referencing non-existent template should return error."""
-        from scripts.template_manager import validate_semantic
-
-        invalid_yaml = '''version: "1.0"
-categories:
-  - id: test-category
-    name: "Test Category"
-
-templates:
-  - id: test-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Test Template"
-    description: "Template with invalid relates_to"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-    relates_to:
-      - template_id: nonexistent-template
-        relationship: production_version
-'''
-        templates_path = temp_yaml_file(invalid_yaml)
+        templates_path = shared_yaml_file(INVALID_RELATES_TO_YAML)
         errors = validate_semantic(templates_path)
         assert len(errors) > 0, "Expected validation errors for invalid relates_to reference"
 
@@ -153,8 +242,6 @@ class TestCombinedValidation:
         self, temp_yaml_file, temp_schema_file, valid_templates_yaml
     ):
         """validate() should run both schema and semantic validation."""
-        from scripts.template_manager import validate
-
         templates_path = temp_yaml_file(valid_templates_yaml)
         result = validate(templates_path, temp_schema_file)
         assert result.success is True
@@ -163,41 +250,59 @@ class TestCombinedValidation:
 
     def test_validate_returns_all_errors(self, temp_yaml_file, temp_schema_file):
         """validate() should return both schema and semantic errors."""
-        from scripts.template_manager import validate
-
-        # This YAML has both schema and semantic issues
-        invalid_yaml = '''version: "1.0"
-categories:
-  - id: existing-category
-    name: "Existing"
-
-templates:
-  - id: template-1
-    repo:
-      owner: "test"
-      name: "test"
-    title: "Template 1"
-    description: "Test"
-    category: nonexistent-category  # semantic error
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-'''
-        templates_path = temp_yaml_file(invalid_yaml)
+        templates_path = temp_yaml_file(UNKNOWN_CATEGORY_YAML)
         result = validate(templates_path, temp_schema_file)
         assert result.success is False
         # Should have semantic error for category reference
         assert len(result.semantic_errors) > 0
 
+    def test_validate_fail_fast_skips_semantic_on_schema_errors(
+        self, temp_yaml_file, temp_schema_file, invalid_duplicate_ids_yaml
+    ):
+        """With fail_fast, semantic checks should only run once the schema passes."""
+        broken_path = temp_yaml_file('version: "1.0"\ntemplates:\n  - id: a\n  - id: a\n')
+        result = validate(broken_path, temp_schema_file, fail_fast=True)
+        assert result.success is False
+        assert result.schema_errors
+        assert result.semantic_errors == []
+
+        # A schema-valid document still gets its semantic errors
+        result = validate(temp_yaml_file(invalid_duplicate_ids_yaml), temp_schema_file, fail_fast=True)
+        assert result.schema_errors == []
+        assert result.semantic_errors
+
+    def test_validate_parses_templates_once(
+        self, temp_yaml_file, temp_schema_file, valid_templates_yaml, monkeypatch
+    ):
+        """validate() should load templates.yaml once and share it between levels."""
+        templates_path = temp_yaml_file(valid_templates_yaml)
+        loaded = []
+        original_load_yaml = tm.load_yaml
+
+        def counting_load_yaml(path, *args, **kwargs):
+            loaded.append(Path(path))
+            return original_load_yaml(path, *args, **kwargs)
+
+        monkeypatch.setattr(tm, "load_yaml", counting_load_yaml)
+        result = tm.validate(templates_path, temp_schema_file)
+        assert result.success is True
+        assert loaded.count(templates_path) == 1
+
+    def test_load_yaml_is_memoized_until_file_changes(self, temp_yaml_file):
+        """Repeated safe loads of an unchanged file should reuse the parsed data."""
+        path = temp_yaml_file("version: \"1.0\"\n")
+        first = load_yaml(path)
+        assert load_yaml(path) is first
+
+        path.write_text("version: \"1.0\"\ncategories: []\n")
+        assert load_yaml(path) == {"version": "1.0", "categories": []}
+
 
 class TestEdgeCases:
     """Test edge cases and error handling."""
 
     def test_validate_empty_file_returns_error(self, temp_yaml_file, temp_schema_file):
         """Empty YAML file should return validation error, not crash."""
-        from scripts.template_manager import validate
-
         empty_path = temp_yaml_file("")
         result = validate(empty_path, temp_schema_file)
         assert result.success is False
@@ -205,13 +310,7 @@ class TestEdgeCases:
 
     def test_validate_list_root_returns_error(self, temp_yaml_file, temp_schema_file):
         """YAML with list at root should return validation error, not crash."""
-        from scripts.template_manager import validate
-
-        list_yaml = '''- item1
-- item2
-- item3
-'''
-        templates_path = temp_yaml_file(list_yaml)
+        templates_path = temp_yaml_file(LIST_ROOT_YAML)
         result = validate(templates_path, temp_schema_file)
         assert result.success is False
         assert len(result.schema_errors) > 0
@@ -219,39 +318,14 @@ class TestEdgeCases:
 
     def test_validate_explicit_null_values_no_crash(self, temp_yaml_file, temp_schema_file):
         """Explicit null values (categories: null) should not crash."""
-        from scripts.template_manager import validate
-
-        null_yaml = '''version: "1.0"
-categories: null
-templates: null
-'''
-        templates_path = temp_yaml_file(null_yaml)
+        templates_path = temp_yaml_file(EXPLICIT_NULLS_YAML)
         result = validate(templates_path, temp_schema_file)
         # Should not crash - may pass or fail validation, but shouldn't raise exception
         assert isinstance(result.success, bool)
 
     def test_validate_semantic_handles_missing_category_id(self, temp_yaml_file):
         """Categories without 'id' field should not crash."""
-        from scripts.template_manager import validate_semantic
-
-        invalid_yaml = '''version: "1.0"
-categories:
-  - name: "Missing ID Category"
-
-templates:
-  - id: test-template
-    repo:
-      owner: "test"
-      name: "test"
-    title: "Test"
-    description: "Test"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-'''
-        templates_path = temp_yaml_file(invalid_yaml)
+        templates_path = temp_yaml_file(MISSING_CATEGORY_ID_YAML)
         # Should not crash
         errors = validate_semantic(templates_path)
         assert isinstance(errors, list)
@@ -264,8 +338,6 @@ class TestValidateWithRealFiles:
         self, templates_yaml_path, schema_yaml_path
     ):
         """Current templates.yaml in project should pass all validation."""
-        from scripts.template_manager import validate
-
         result = validate(templates_yaml_path, schema_yaml_path)
         assert result.success is True, (
             f"Current templates.yaml should be valid.\n"
@@ -3,44 +3,57 @@
 These tests define the expected behavior for template modification commands.
 """
 
-import json
-import subprocess
-import sys
-from pathlib import Path
-
 import pytest
 
+import scripts.template_manager as tm
+from scripts.template_manager import (
+    ERR_DUPLICATE_ID,
+    ERR_INVALID_CATEGORY,
+    ERR_INVALID_ID,
+    ERR_INVALID_OWNER,
+    ERR_INVALID_REPO,
+    ERR_NOT_FOUND,
+    TemplateSession,
+    add_template,
+    load_yaml,
+    remove_template,
+    save_yaml,
+    update_template,
+    validate,
+    validate_data,
+)
+
+
+# Valid add_template() arguments for the empty/single registry fixtures
+ADD_DEFAULTS = {
+    "template_id": "new-template",
+    "repo_owner": "test-org",
+    "repo_name": "test-repo",
+    "title": "New Template",
+    "description": "A new test template",
+    "category": "test-category",
+}
+
+
+class TestWriteSubcommands:
+    """Test that the write subcommands are registered."""
+
+    @pytest.mark.parametrize("subcmd", ["add", "update", "remove"])
+    def test_subcommand_registered(self, available_subcommands, subcmd):
+        """add, update and remove subcommands should exist."""
+        assert subcmd in available_subcommands, (
+            f"{subcmd} subcommand should exist: {sorted(available_subcommands)}"
+        )
+
 
 class TestAddCommand:
     """Test the add subcommand."""
 
-    def test_add_command_exists(self, project_root):
-        """add subcommand should exist."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "add", "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0, f"add subcommand should exist: {result.stderr}"
-
-    def test_add_creates_new_template_entry(self, project_root, tmp_path):
+    def test_add_creates_new_template_entry(self, empty_templates_file):
         """add should create a new template entry in the YAML file."""
-        from scripts.template_manager import add_template, load_yaml
-
-        # Create a test templates file
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test Category"
-
-templates: []
-''')
-
         # Add a new template
         result = add_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="new-template",
             repo_owner="test-org",
             repo_name="test-repo",
@@ -52,77 +65,63 @@ templates: []
         assert result.success is True, f"Add should succeed: {result.errors}"
 
         # Verify the template was added
-        data = load_yaml(test_templates)
+        data = load_yaml(empty_templates_file)
         templates = data.get("templates") or []
         assert len(templates) == 1
         assert templates[0]["id"] == "new-template"
 
-    def test_add_validates_before_writing(self, project_root, tmp_path):
-        """add should validate the new template before writing."""
-        from scripts.template_manager import add_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories: []
-templates: []
-''')
-
-        # Try to add template with invalid category
+    def test_add_returns_saved_data_for_in_memory_validation(self, schema_yaml_path, empty_templates_file):
+        """add should return the saved registry so it can be validated without a reload."""
         result = add_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="new-template",
             repo_owner="test-org",
             repo_name="test-repo",
             title="New Template",
             description="A new test template",
-            category="nonexistent-category",
-        )
-
-        assert result.success is False
-        assert "category" in str(result.errors).lower()
-
-    def test_add_rejects_duplicate_id(self, project_root, tmp_path):
-        """add should reject templates with duplicate IDs."""
-        from scripts.template_manager import add_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test Category"
-
-templates:
-  - id: existing-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Existing Template"
-    description: "Already exists"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-''')
-
-        result = add_template(
-            templates_path=test_templates,
-            template_id="existing-template",
-            repo_owner="test-org",
-            repo_name="another-repo",
-            title="Duplicate Template",
-            description="Should fail",
             category="test-category",
         )
 
+        assert result.success is True, f"Add should succeed: {result.errors}"
+        assert result.data["templates"][0]["id"] == "new-template"
+        assert validate_data(result.data, schema_yaml_path) == validate(empty_templates_file, schema_yaml_path)
+
+    @pytest.mark.parametrize(
+        "bad_kwargs, templates_fixture, expected_code",
+        [
+            pytest.param(
+                {"category": "nonexistent-category"},
+                "empty_templates_file",
+                ERR_INVALID_CATEGORY,
+                id="unknown-category",
+            ),
+            pytest.param(
+                {"template_id": "test-template"},
+                "single_template_file",
+                ERR_DUPLICATE_ID,
+                id="duplicate-id",
+            ),
+            pytest.param(
+                {"template_id": "Invalid_ID"},  # Invalid: uppercase and underscore
+                "empty_templates_file",
+                ERR_INVALID_ID,
+                id="invalid-id-format",
+            ),
+        ],
+    )
+    def test_add_rejects_invalid_input(self, request, bad_kwargs, templates_fixture, expected_code):
+        """add should validate the new template and leave the file untouched on failure."""
+        templates_path = request.getfixturevalue(templates_fixture)
+        original = templates_path.read_bytes()
+
+        result = add_template(templates_path=templates_path, **{**ADD_DEFAULTS, **bad_kwargs})
+
         assert result.success is False
-        assert "duplicate" in str(result.errors).lower() or "exists" in str(result.errors).lower()
+        assert result.has_error(expected_code), result.errors
+        assert templates_path.read_bytes() == original
 
-    def test_add_preserves_yaml_comments(self, project_root, tmp_path):
+    def test_add_preserves_yaml_comments(self, tmp_path):
         """add should preserve existing YAML comments."""
-        from scripts.template_manager import add_template
-
         test_templates = tmp_path / "templates.yaml"
         original_content = '''# This is a header comment
 version: "1.0"
@@ -148,51 +147,16 @@ templates: []
         )
 
         # Check that comments are preserved
-        new_content = test_templates.read_text()
-        assert "# This is a header comment" in new_content
-        assert "# Categories section" in new_content
-        assert "# Templates section" in new_content
-
-    def test_add_validates_template_id_format(self, project_root, tmp_path):
-        """add should validate template ID format (lowercase, hyphens)."""
-        from scripts.template_manager import add_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories:
-  - id: test-category
-    name: "Test"
-templates: []
-''')
-
-        result = add_template(
-            templates_path=test_templates,
-            template_id="Invalid_ID",  # Invalid: uppercase and underscore
-            repo_owner="test-org",
-            repo_name="test-repo",
-            title="Test",
-            description="Test",
-            category="test-category",
-        )
-
-        assert result.success is False
-        assert "id" in str(result.errors).lower() or "pattern" in str(result.errors).lower()
+        new_content = test_templates.read_bytes()
+        assert b"# This is a header comment" in new_content
+        assert b"# Categories section" in new_content
+        assert b"# Templates section" in new_content
 
-    def test_add_validates_repo_owner_format(self, project_root, tmp_path):
+    def test_add_validates_repo_owner_format(self, empty_templates_file):
         """add should validate repo owner format (security: prevent injection)."""
-        from scripts.template_manager import add_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories:
-  - id: test-category
-    name: "Test"
-templates: []
-''')
-
         # Test malicious owner with special characters
         result = add_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="test-template",
             repo_owner="../../../etc",  # Path traversal attempt
             repo_name="test-repo",
@@ -201,11 +165,11 @@ templates: []
             category="test-category",
         )
         assert result.success is False
-        assert "owner" in str(result.errors).lower()
+        assert result.has_error(ERR_INVALID_OWNER), result.errors
 
         # Test owner starting with hyphen
         result = add_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="test-template",
             repo_owner="-invalid",
             repo_name="test-repo",
@@ -215,21 +179,11 @@ templates: []
         )
         assert result.success is False
 
-    def test_add_validates_repo_name_format(self, project_root, tmp_path):
+    def test_add_validates_repo_name_format(self, empty_templates_file):
         """add should validate repo name format (security: prevent injection)."""
-        from scripts.template_manager import add_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories:
-  - id: test-category
-    name: "Test"
-templates: []
-''')
-
         # Test malicious repo name with shell characters
         result = add_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="test-template",
             repo_owner="test-org",
             repo_name="repo; rm -rf /",  # Command injection attempt
@@ -238,7 +192,7 @@ templates: []
             category="test-category",
         )
         assert result.success is False
-        assert "repo" in str(result.errors).lower() or "name" in str(result.errors).lower()
+        assert result.has_error(ERR_INVALID_REPO), result.errors
 
 
 class TestSecurityHardening:
@@ -246,8 +200,6 @@ class TestSecurityHardening:
 
     def test_load_yaml_rejects_symlinks(self, tmp_path):
         """load_yaml should reject symlinks to prevent LFI attacks."""
-        from scripts.template_manager import load_yaml
-
         # Create a real file and a symlink to it
         real_file = tmp_path / "real.yaml"
         real_file.write_text('version: "1.0"\ncategories: []\ntemplates: []')
@@ -264,8 +216,6 @@ class TestSecurityHardening:
 
     def test_save_yaml_rejects_symlinks(self, tmp_path):
         """save_yaml should reject symlinks to prevent symlink race attacks."""
-        from scripts.template_manager import save_yaml, load_yaml_raw
-
         # Create a real file and a symlink to it
         real_file = tmp_path / "real.yaml"
         real_file.write_text('version: "1.0"\ncategories: []\ntemplates: []')
@@ -278,46 +228,32 @@ class TestSecurityHardening:
         with pytest.raises(ValueError, match="symlink"):
             save_yaml(symlink, data)
 
+    def test_save_yaml_rejects_dangling_symlinks(self, tmp_path):
+        """save_yaml should reject symlinks even when their target is missing."""
+        symlink = tmp_path / "dangling.yaml"
+        symlink.symlink_to(tmp_path / "missing.yaml")
 
-class TestUpdateCommand:
-    """Test the update subcommand."""
+        with pytest.raises(ValueError, match="symlink"):
+            save_yaml(symlink, {"version": "1.0"})
+        assert not (tmp_path / "missing.yaml").exists()
 
-    def test_update_command_exists(self, project_root):
-        """update subcommand should exist."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "update", "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0, f"update subcommand should exist: {result.stderr}"
+    def test_save_yaml_preserves_file_mode(self, tmp_path):
+        """save_yaml should keep the permissions of the file it replaces."""
+        target = tmp_path / "templates.yaml"
+        target.write_text('version: "1.0"\n')
+        target.chmod(0o600)
 
-    def test_update_modifies_existing_template(self, project_root, tmp_path):
-        """update should modify an existing template's fields."""
-        from scripts.template_manager import update_template, load_yaml
+        save_yaml(target, {"version": "1.0", "templates": []})
+        assert target.stat().st_mode & 0o777 == 0o600
 
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test Category"
 
-templates:
-  - id: test-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Original Title"
-    description: "Original description"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-''')
+class TestUpdateCommand:
+    """Test the update subcommand."""
 
+    def test_update_modifies_existing_template(self, single_template_file):
+        """update should modify an existing template's fields."""
         result = update_template(
-            templates_path=test_templates,
+            templates_path=single_template_file,
             template_id="test-template",
             title="Updated Title",
             description="Updated description",
@@ -325,101 +261,43 @@ templates:
 
         assert result.success is True, f"Update should succeed: {result.errors}"
 
-        data = load_yaml(test_templates)
+        data = load_yaml(single_template_file)
         template = data["templates"][0]
         assert template["title"] == "Updated Title"
         assert template["description"] == "Updated description"
 
-    def test_update_nonexistent_template_errors(self, project_root, tmp_path):
+    def test_update_nonexistent_template_errors(self, empty_templates_file):
         """update should error when template doesn't exist."""
-        from scripts.template_manager import update_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories: []
-templates: []
-''')
-
         result = update_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="nonexistent-template",
             title="New Title",
         )
 
         assert result.success is False
-        assert "not found" in str(result.errors).lower() or "exist" in str(result.errors).lower()
+        assert result.has_error(ERR_NOT_FOUND), result.errors
 
-    def test_update_validates_changes(self, project_root, tmp_path):
+    def test_update_validates_changes(self, single_template_file):
         """update should validate changes before writing."""
-        from scripts.template_manager import update_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test"
-
-templates:
-  - id: test-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Test"
-    description: "Test"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-''')
-
         # Try to update to invalid category
         result = update_template(
-            templates_path=test_templates,
+            templates_path=single_template_file,
             template_id="test-template",
             category="nonexistent-category",
         )
 
         assert result.success is False
-        assert "category" in str(result.errors).lower()
+        assert result.has_error(ERR_INVALID_CATEGORY), result.errors
 
-    def test_update_preserves_unmodified_fields(self, project_root, tmp_path):
+    def test_update_preserves_unmodified_fields(self, single_template_file):
         """update should preserve fields not being modified."""
-        from scripts.template_manager import update_template, load_yaml
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test"
-
-templates:
-  - id: test-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Original Title"
-    description: "Original description"
-    category: test-category
-    tier: starter
-    tags:
-      - tag1
-      - tag2
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-''')
-
         update_template(
-            templates_path=test_templates,
+            templates_path=single_template_file,
             template_id="test-template",
             title="Updated Title",
         )
 
-        data = load_yaml(test_templates)
+        data = load_yaml(single_template_file)
         template = data["templates"][0]
         assert template["title"] == "Updated Title"
         assert template["description"] == "Original description"  # Preserved
@@ -430,127 +308,94 @@ templates:
 class TestRemoveCommand:
     """Test the remove subcommand."""
 
-    def test_remove_command_exists(self, project_root):
-        """remove subcommand should exist."""
-        result = subprocess.run(
-            [sys.executable, str(project_root / "scripts" / "template_manager.py"), "remove", "--help"],
-            capture_output=True,
-            text=True,
-        )
-        assert result.returncode == 0, f"remove subcommand should exist: {result.stderr}"
-
-    def test_remove_deletes_template(self, project_root, tmp_path):
+    def test_remove_deletes_template(self, two_template_file):
         """remove should delete a template from the file."""
-        from scripts.template_manager import remove_template, load_yaml
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test"
-
-templates:
-  - id: template-to-remove
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "To Remove"
-    description: "Will be removed"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-  - id: template-to-keep
-    repo:
-      owner: "test-org"
-      name: "another-repo"
-    title: "To Keep"
-    description: "Will remain"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-''')
-
         result = remove_template(
-            templates_path=test_templates,
+            templates_path=two_template_file,
             template_id="template-to-remove",
             force=True,
         )
 
         assert result.success is True, f"Remove should succeed: {result.errors}"
 
-        data = load_yaml(test_templates)
+        data = load_yaml(two_template_file)
         templates = data.get("templates") or []
         assert len(templates) == 1
         assert templates[0]["id"] == "template-to-keep"
 
-    def test_remove_nonexistent_template_errors(self, project_root, tmp_path):
+    def test_remove_nonexistent_template_errors(self, empty_templates_file):
         """remove should error when template doesn't exist."""
-        from scripts.template_manager import remove_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-categories: []
-templates: []
-''')
-
         result = remove_template(
-            templates_path=test_templates,
+            templates_path=empty_templates_file,
             template_id="nonexistent-template",
             force=True,
         )
 
         assert result.success is False
-        assert "not found" in str(result.errors).lower() or "exist" in str(result.errors).lower()
+        assert result.has_error(ERR_NOT_FOUND), result.errors
 
-    def test_remove_checks_relates_to_references(self, project_root, tmp_path):
+    def test_remove_checks_relates_to_references(self, referenced_template_file):
         """remove should warn/error if other templates reference it."""
-        from scripts.template_manager import remove_template
-
-        test_templates = tmp_path / "templates.yaml"
-        test_templates.write_text('''version: "1.0"
-
-categories:
-  - id: test-category
-    name: "Test"
-
-templates:
-  - id: referenced-template
-    repo:
-      owner: "test-org"
-      name: "test-repo"
-    title: "Referenced"
-    description: "Other templates reference this"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-  - id: referencing-template
-    repo:
-      owner: "test-org"
-      name: "another-repo"
-    title: "Referencing"
-    description: "References another template"
-    category: test-category
-    directories:
-      docs:
-        - path: "README.md"
-          target: "overview.md"
-    relates_to:
-      - template_id: referenced-template
-        relationship: production_version
-''')
-
         result = remove_template(
-            templates_path=test_templates,
+            templates_path=referenced_template_file,
             template_id="referenced-template",
             force=False,
         )
 
         # Should fail or warn about the reference
         assert result.success is False or len(result.warnings) > 0
+
+    def test_remove_warning_lists_all_referencing_templates(self, referenced_template_file):
+        """remove should name every template whose relates_to points at the target."""
+        result = remove_template(
+            templates_path=referenced_template_file,
+            template_id="referenced-template",
+            force=False,
+        )
+
+        assert result.success is False
+        assert "first-referrer" in result.warnings[0]
+        assert "second-referrer" in result.warnings[0]
+
+
+class TestTemplateSession:
+    """Test batching several write operations into one save."""
+
+    def test_session_batches_writes(self, empty_templates_file, monkeypatch):
+        """add + update + remove in a session should save the file exactly once."""
+        saves = []
+        original_save_yaml = tm.save_yaml
+
+        def counting_save_yaml(path, data, *args, **kwargs):
+            saves.append(path)
+            return original_save_yaml(path, data, *args, **kwargs)
+
+        monkeypatch.setattr(tm, "save_yaml", counting_save_yaml)
+
+        session = TemplateSession(empty_templates_file)
+        assert session.add(**ADD_DEFAULTS).success is True
+        assert session.add(**{**ADD_DEFAULTS, "template_id": "second-template"}).success is True
+        assert session.update("new-template", title="Updated Title").success is True
+        assert session.remove("second-template", force=True).success is True
+        assert saves == [], "Nothing should be written before commit()"
+
+        result = session.commit()
+        assert result.success is True
+        assert saves == [empty_templates_file]
+
+        templates = load_yaml(empty_templates_file)["templates"]
+        assert [t["id"] for t in templates] == ["new-template"]
+        assert templates[0]["title"] == "Updated Title"
+
+    def test_session_failed_operation_leaves_document_unchanged(self, single_template_file):
+        """A rejected operation should not change the pending document or the file."""
+        original = single_template_file.read_bytes()
+
+        session = TemplateSession(single_template_file)
+        result = session.update("test-template", category="nonexistent-category")
+        assert result.has_error(ERR_INVALID_CATEGORY)
+        assert session.add(**{**ADD_DEFAULTS, "template_id": "test-template"}).has_error(ERR_DUPLICATE_ID)
+
+        assert session.commit().success is True
+        assert single_template_file.read_bytes() == original
+        assert session.data["templates"][0]["category"] == "test-category"